@@ -1,5 +1,6 @@
 from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Header, Depends
 from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 import os
@@ -11,6 +12,7 @@ from datetime import datetime
 import shutil
 import zipfile
 import io
+from itertools import islice
 
 # Import custom modules
 from database import init_db, migrate_database, get_db, hash_password, verify_password, encrypt_token, decrypt_token
@@ -21,7 +23,7 @@ from services.test_validator import TestValidator
 from services.context_analyzer import ContextAnalyzer
 from services.log_chunker import LogChunker, ChunkSummarizer, ChunkIndex
 from services.git_client import GitClient
-from services.git_detector import GitRepositoryDetector
+from services.git_detector import default_detector as git_repo_detector
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -87,6 +89,9 @@ class AnalysisContextCache:
 # Global cache instance (1 hour TTL)
 analysis_cache = AnalysisContextCache(ttl_seconds=3600)
 
+# Shared project context analyzer (caches results per project root)
+context_analyzer = ContextAnalyzer()
+
 # ==================== Models ====================
 
 class RegisterRequest(BaseModel):
@@ -393,6 +398,26 @@ async def save_git_config(request: GitConfigRequest, user_id: int = Depends(get_
         conn.close()
         raise HTTPException(status_code=500, detail=str(e))
 
+def check_git_connection(provider: str, token: str, repository: Optional[str]) -> Dict[str, Any]:
+    """Test a Git token (and repository access, if configured) with blocking API calls"""
+    # Test token using /user API (no repository required - more reliable!)
+    with GitClient(
+        provider=provider,
+        token=token,
+        repository="dummy/dummy"  # Not used for token test
+    ) as git_client:
+        result = git_client.test_token()
+        
+        # If token is valid and repository is configured, also test repository access
+        if result['success'] and repository:
+            git_client.repository = repository
+            repo_test = git_client.test_connection()
+            result['repository_access'] = repo_test['success']
+            if repo_test['success']:
+                result['repository_info'] = repo_test['repository_info']
+    
+    return result
+
 @api_router.post("/settings/git-config/test")
 async def test_git_connection(user_id: int = Depends(get_current_user)):
     """Test Git token validity using user API (more reliable)"""
@@ -421,24 +446,8 @@ async def test_git_connection(user_id: int = Depends(get_current_user)):
                 "message": "Invalid token configuration"
             }
         
-        # Test token using /user API (no repository required - more reliable!)
-        git_client = GitClient(
-            provider=config["git_provider"],
-            token=token,
-            repository="dummy/dummy"  # Not used for token test
-        )
-        
-        result = git_client.test_token()
-        
-        # If token is valid and repository is configured, also test repository access
-        if result['success'] and config["repository"]:
-            git_client.repository = config["repository"]
-            repo_test = git_client.test_connection()
-            result['repository_access'] = repo_test['success']
-            if repo_test['success']:
-                result['repository_info'] = repo_test['repository_info']
-        
-        return result
+        # GitClient blocks (including rate-limit retry waits): keep it off the event loop
+        return await run_in_threadpool(check_git_connection, config["git_provider"], token, config["repository"])
         
     except Exception as e:
         conn.close()
@@ -814,27 +823,31 @@ async def process_with_chunking(
         total_perf_issues = []
         all_patterns = set()
         
-        for chunk in chunker.stream_chunks(file_path):
-            chunk_count += 1
-            print(f"  📦 Processing chunk {chunk_count} (lines {chunk['start_line']}-{chunk['end_line']})...")
+        # Summarize in bounded batches so only one batch of chunks is in memory
+        # and each batch's summaries are stored as soon as they're paid for
+        batch_size = 64  # 8 concurrent calls x 8
+        chunk_stream = chunker.stream_chunks(file_path, compute_hash=False)
+        while True:
+            chunks = list(islice(chunk_stream, batch_size))
+            if not chunks:
+                break
             
-            try:
-                # Summarize chunk
-                summary = await summarizer.summarize_chunk(chunk)
-                
-                # Store in database
-                chunk_index.store_chunk_summary(analysis_id, summary)
-                
+            for chunk in chunks:
+                chunk_count += 1
+                print(f"  📦 Processing chunk {chunk_count} (lines {chunk.start_line}-{chunk.end_line})...")
+            
+            # Summarize chunks concurrently (failed chunks come back as error summaries)
+            summaries = await summarizer.summarize_all(chunks)
+            
+            for summary in summaries:
                 # Aggregate data
                 total_errors.extend(summary.get('errors_found', []))
                 total_api_calls.extend(summary.get('api_calls', []))
                 total_perf_issues.extend(summary.get('performance_issues', []))
                 all_patterns.update(summary.get('key_patterns', []))
-                
-            except Exception as e:
-                print(f"  ⚠️ Error processing chunk {chunk_count}: {e}")
-                # Continue with next chunk
-                continue
+            
+            # Store in database (one transaction per batch)
+            chunk_index.store_chunk_summaries_bulk(analysis_id, summaries)
         
         print(f"✅ Processed {chunk_count} chunks successfully!")
         
@@ -942,8 +955,7 @@ async def analyze_logs(
             log_content = f.read()
         
         # Detect Git repository from log content
-        git_detector = GitRepositoryDetector()
-        git_detection = git_detector.detect_repository(log_content, analysis["filename"])
+        git_detection = git_repo_detector.detect_repository(log_content, analysis["filename"])
         
         # Check for user-provided repository mappings
         detected_repo = git_detection.get('repository')
@@ -1209,7 +1221,6 @@ async def generate_tests(
             test_gen_prompt = custom_prompt_row["test_generation_prompt"]
         
         # Analyze project context for context-aware test generation
-        context_analyzer = ContextAnalyzer()
         project_context = context_analyzer.analyze_project_context(analysis["file_path"])
         context_summary = context_analyzer.format_context_for_prompt(project_context)
         
@@ -1574,6 +1585,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("shutdown")
+async def close_llm_clients():
+    await TestGenerator.aclose()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
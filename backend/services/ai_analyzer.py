@@ -1,18 +1,73 @@
 import os
 import re
 import json
-from typing import Dict, List, Any
+import hashlib
+from cachetools import LRUCache
+from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Patterns compiled once at import time and shared across analyzer instances
+_ERROR_KEYWORDS_RE = re.compile(
+    r'\berror\b|\bfail(ed|ure)?\b|\bexception\b|\bcrash(ed)?\b'
+    r'|\bwarn(ing)?\b|\bcritical\b|\bfatal\b|\bpanic\b'
+    r'|\b4\d{2}\b|\b5\d{2}\b'  # HTTP 4xx, 5xx codes
+    r'|\btimeout\b|\brefused\b|\bdenied\b|\bunavailable\b',
+    re.IGNORECASE
+)
+_ERR_LINE_RE = re.compile(r'(error|exception|failure|timeout).*', re.IGNORECASE)
+_API_RE = re.compile(r'(GET|POST|PUT|DELETE|PATCH)\s+(/[^\s]+)')
+
+
+def _extract_json(text: str) -> Optional[str]:
+    """
+    Return the first balanced {...} object in text, or None.
+
+    Single O(n) scan that tracks string literals and escapes, so braces inside
+    JSON strings don't affect nesting and prose around the object is ignored.
+    """
+    start = text.find('{')
+    if start < 0:
+        return None
+
+    depth = 0
+    in_str = False
+    escaped = False
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_str:
+            if escaped:
+                escaped = False
+            elif c == '\\':
+                escaped = True
+            elif c == '"':
+                in_str = False
+        elif c == '"':
+            in_str = True
+        elif c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
 class LogAnalyzer:
     """AI-powered log analysis service using direct API calls"""
     
+    # Configured Gemini models keyed by (key digest, model_name, system
+    # prompt digest), bounded so rotated keys and edited prompts don't pile up
+    _gemini_models = LRUCache(maxsize=64)
+    
     def __init__(self, ai_model: str = "gpt-4o", api_key: str = None):
         self.ai_model = ai_model
         self.api_key = api_key
         
+        # Model cache keys carry a digest of the API key, never the key itself
+        self._key_digest = hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+        
         # Determine provider and model
         if "gpt" in ai_model or "openai" in ai_model:
             self.provider = "openai"
@@ -46,19 +101,8 @@ class LogAnalyzer:
             if len(content) <= max_chars:
                 return content
             
-            # Error patterns to detect (case-insensitive)
-            error_keywords = [
-                r'\berror\b', r'\bfail(ed|ure)?\b', r'\bexception\b', r'\bcrash(ed)?\b',
-                r'\bwarn(ing)?\b', r'\bcritical\b', r'\bfatal\b', r'\bpanic\b',
-                r'\b4\d{2}\b', r'\b5\d{2}\b',  # HTTP 4xx, 5xx codes
-                r'\btimeout\b', r'\brefused\b', r'\bdenied\b', r'\bunavailable\b'
-            ]
-            
-            # Find all error positions
-            error_positions = []
-            for pattern in error_keywords:
-                for match in re.finditer(pattern, content, re.IGNORECASE):
-                    error_positions.append(match.start())
+            # Find all error positions (single pass over the precompiled union)
+            error_positions = [match.start() for match in _ERROR_KEYWORDS_RE.finditer(content)]
             
             if not error_positions:
                 # No errors found, fallback to original sampling
@@ -253,11 +297,15 @@ Format your response as a structured JSON with these keys:
         """Call Google Gemini API directly"""
         import google.generativeai as genai
         
-        genai.configure(api_key=self.api_key)
-        model = genai.GenerativeModel(
-            model_name=self.model_name,
-            system_instruction=system_prompt
-        )
+        key = (self._key_digest, self.model_name, hashlib.sha256(system_prompt.encode()).hexdigest())
+        model = self._gemini_models.get(key)
+        if model is None:
+            genai.configure(api_key=self.api_key)
+            model = genai.GenerativeModel(
+                model_name=self.model_name,
+                system_instruction=system_prompt
+            )
+            self._gemini_models[key] = model
         
         response = await model.generate_content_async(prompt)
         return response.text
@@ -266,9 +314,9 @@ Format your response as a structured JSON with these keys:
         """Parse AI response into structured format"""
         try:
             # Try to extract JSON from response
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
+            candidate = _extract_json(response)
+            if candidate:
+                return json.loads(candidate)
             else:
                 # Fallback: create structured response from text
                 return {
@@ -293,7 +341,7 @@ Format your response as a structured JSON with these keys:
         """Extract error patterns from text"""
         patterns = []
         # Simple regex to find error mentions
-        error_lines = re.findall(r'(?i)(error|exception|failure|timeout).*', text)
+        error_lines = _ERR_LINE_RE.findall(text)
         for line in error_lines[:5]:  # Limit to 5 patterns
             patterns.append({
                 "type": "error",
@@ -307,7 +355,7 @@ Format your response as a structured JSON with these keys:
         """Extract API endpoints from text"""
         endpoints = []
         # Simple regex for API paths
-        api_patterns = re.findall(r'(GET|POST|PUT|DELETE|PATCH)\s+(/[^\s]+)', text)
+        api_patterns = _API_RE.findall(text)
         for method, path in api_patterns[:10]:  # Limit to 10 endpoints
             endpoints.append({
                 "method": method,
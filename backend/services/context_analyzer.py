@@ -3,15 +3,119 @@ Context Analyzer Service - Extracts project structure and patterns
 for generating better, context-aware tests.
 """
 import os
+import copy
 import json
 import re
-from pathlib import Path
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from typing import Dict, Any, List, Optional
+from cachetools import LRUCache
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # optional C-accelerated parser
+    _json_loads = json.loads
+
+
+
+@lru_cache(maxsize=1024)
+def _find_project_root(start_dir: str, root_markers: frozenset) -> Optional[str]:
+    """
+    Find project root by looking for config files, walking up from start_dir
+    
+    Module-level and keyed on hashable strings so results are memoized
+    across analyzer instances; many logs share the same parent directory.
+    """
+    current_path = start_dir
+    
+    # Traverse up to find project root (max 5 levels)
+    for _ in range(5):
+        # One directory listing per level instead of a stat per marker
+        try:
+            with os.scandir(current_path) as it:
+                names = {entry.name for entry in it}
+        except OSError:
+            names = set()
+        
+        # Check for common project indicators and .git
+        if not root_markers.isdisjoint(names):
+            return current_path
+        
+        parent = os.path.dirname(current_path)
+        if not parent or parent == current_path:  # Reached root
+            break
+        current_path = parent
+    
+    return None
 
 
 class ContextAnalyzer:
     """Analyzes project structure to provide context for test generation"""
     
+    # (marker file, project type, language), checked in priority order
+    _TYPE_MARKERS = (
+        ('package.json', 'nodejs', 'javascript'),
+        ('requirements.txt', 'python', 'python'),
+        ('setup.py', 'python', 'python'),
+        ('pom.xml', 'java', 'java'),
+        ('build.gradle', 'java', 'java'),
+        ('Gemfile', 'ruby', 'ruby'),
+        ('go.mod', 'go', 'go'),
+        ('Cargo.toml', 'rust', 'rust'),
+    )
+    
+    # Conventional top-level source and test directory names, in priority order
+    _SRC_DIR_CANDIDATES = ('src', 'lib', 'app', 'source')
+    _TEST_DIR_CANDIDATES = ('test', 'tests', '__tests__', 'spec')
+    
+    # (dependency name, framework) per language, checked in priority order
+    _JS_FRAMEWORKS = (('jest', 'jest'), ('mocha', 'mocha'), ('cypress', 'cypress'), ('vitest', 'vitest'))
+    _FRAMEWORK_MARKERS = {
+        'javascript': _JS_FRAMEWORKS,
+        'typescript': _JS_FRAMEWORKS,
+        'python': (('pytest', 'pytest'), ('unittest', 'unittest')),
+        'ruby': (('rspec', 'rspec'),),
+    }
+    
+    # (root entry, framework) used when no dependency names a framework
+    _FRAMEWORK_FALLBACKS = {
+        'python': ('tests', 'unittest'),
+        'java': ('pom.xml', 'junit'),
+    }
+    
+    # Manifests whose contents feed the context (and its cache signature)
+    _MANIFEST_FILES = ('package.json', 'requirements.txt')
+    
+    # Project roots whose analysis (and manifests) each analyzer keeps
+    CONTEXT_CACHE_SIZE = 256
+    
+    # (label, getter) for each line of format_context_for_prompt, in order
+    _PROMPT_FIELDS = (
+        ('Type', lambda c: c.get('project_type')),
+        ('Language', lambda c: c.get('language')),
+        ('Testing Framework', lambda c: c.get('testing_framework')),
+        ('Import Style', lambda c: c.get('import_style')),
+        ('Source Directory', lambda c: c.get('file_structure', {}).get('src_directory')),
+        ('Test Directory', lambda c: c.get('file_structure', {}).get('test_directory')),
+        ('Key Dependencies', lambda c: ', '.join(list(c.get('dependencies') or {})[:10])),
+        ('Test Naming', lambda c: c.get('conventions', {}).get('test_naming')),
+    )
+    
+    # Package name at the start of a requirements.txt line; option lines such
+    # as -r/-e/--index-url don't start with a name character and are skipped
+    _REQ_RE = re.compile(r'\s*([A-Za-z0-9][A-Za-z0-9_.\-]*)')
+    
+    # Test naming convention by filename; alternatives are tried in priority
+    # order at position 0, and lastgroup names the matched convention
+    _CONV_RE = re.compile(
+        r'(?=.*?(?P<suffix>_test|\.test\.))'
+        r'|(?=.*?(?P<prefix>test_|^test))'
+        r'|(?=.*?(?P<spec>_spec|\.spec\.))'
+    )
+    
     def __init__(self):
         self.supported_config_files = [
             'package.json',
@@ -23,6 +127,21 @@ class ContextAnalyzer:
             'go.mod'
         ]
         
+        # Any of these entries in a directory marks it as a project root
+        self._root_markers = frozenset((*self.supported_config_files, '.git'))
+        
+        # Analysis results keyed by resolved project root
+        self._context_cache = LRUCache(maxsize=self.CONTEXT_CACHE_SIZE)
+        
+        # Parsed package.json per project root, shared by the helpers of one analysis
+        self._package_json_cache = LRUCache(maxsize=self.CONTEXT_CACHE_SIZE)
+        
+        # Joined manifest paths per project root
+        self._manifest_path_cache = LRUCache(maxsize=self.CONTEXT_CACHE_SIZE)
+        
+        # Guards the caches above; analysis itself runs unlocked
+        self._lock = threading.Lock()
+        
         self.test_file_patterns = {
             'javascript': [r'\.test\.(js|ts|jsx|tsx)$', r'\.spec\.(js|ts|jsx|tsx)$', r'__tests__'],
             'python': [r'test_.*\.py$', r'.*_test\.py$', r'tests/'],
@@ -30,6 +149,13 @@ class ContextAnalyzer:
             'ruby': [r'.*_spec\.rb$', r'spec/'],
             'go': [r'.*_test\.go$']
         }
+        
+        # One alternation per language so a path is matched in a single pass
+        self._test_file_re = {
+            language: re.compile('|'.join(f'(?:{p})' for p in patterns))
+            for language, patterns in self.test_file_patterns.items()
+        }
+        self._test_file_re['typescript'] = self._test_file_re['javascript']
     
     def analyze_project_context(self, log_file_path: str) -> Dict[str, Any]:
         """
@@ -43,14 +169,26 @@ class ContextAnalyzer:
         - Import patterns
         - Naming conventions
         """
-        # Get project root from log file path
+        # Get project root from log file path (memoized per log directory)
         project_root = self._find_project_root(log_file_path)
         
         if not project_root:
             return self._get_default_context()
         
+        # Reuse a previous analysis unless the dependency manifests changed
+        key = os.path.realpath(project_root)
+        signature = self._manifest_signature(key)
+        with self._lock:
+            cached = self._context_cache.get(key)
+            if cached is not None and cached[0] == signature:
+                # A copy, so callers can't change the cached context
+                return copy.deepcopy(cached[1])
+            
+            # Manifests may have changed since the last analysis of this root
+            self._package_json_cache.pop(project_root, None)
+        
         context = {
-            'project_root': str(project_root),
+            'project_root': project_root,
             'project_type': None,
             'language': None,
             'testing_framework': None,
@@ -61,218 +199,235 @@ class ContextAnalyzer:
             'conventions': {}
         }
         
+        # List the project root once; helpers consult this instead of
+        # probing each marker file and directory separately
+        scan = self._scan_root(project_root)
+        
         # Detect project type and language
-        context.update(self._detect_project_type(project_root))
+        context.update(self._detect_project_type(scan))
         
         # Extract dependencies
-        context['dependencies'] = self._extract_dependencies(project_root, context['project_type'])
+        context['dependencies'] = self._extract_dependencies(project_root, context['project_type'], scan)
         
         # Detect testing framework
         context['testing_framework'] = self._detect_testing_framework(
-            project_root, 
+            scan, 
             context['dependencies'], 
             context['language']
         )
         
         # Analyze test patterns
-        context['test_patterns'] = self._analyze_test_patterns(project_root, context['language'])
+        context['test_patterns'] = self._analyze_test_patterns(project_root, context['language'], scan)
         
         # Detect import style
-        context['import_style'] = self._detect_import_style(project_root, context['language'])
+        context['import_style'] = self._detect_import_style(project_root, context['language'], scan)
         
         # Get file structure
-        context['file_structure'] = self._get_file_structure(project_root, context['language'])
+        context['file_structure'] = self._get_file_structure(context['language'], scan)
         
         # Extract naming conventions
-        context['conventions'] = self._extract_conventions(project_root, context['language'])
+        context['conventions'] = self._extract_conventions(project_root, context['language'], scan)
         
+        with self._lock:
+            self._context_cache[key] = (signature, copy.deepcopy(context))
         return context
     
-    def _find_project_root(self, log_file_path: str) -> Optional[Path]:
-        """Find project root by looking for config files"""
-        current_path = Path(log_file_path).parent
-        
-        # Traverse up to find project root (max 5 levels)
-        for _ in range(5):
-            # Check for common project indicators
-            for config_file in self.supported_config_files:
-                if (current_path / config_file).exists():
-                    return current_path
-            
-            # Check for .git directory
-            if (current_path / '.git').exists():
-                return current_path
-            
-            parent = current_path.parent
-            if parent == current_path:  # Reached root
-                break
-            current_path = parent
+    def analyze_projects(self, log_file_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze project context for many log files concurrently
         
-        return None
+        Scans are dominated by filesystem calls, which release the GIL, so a
+        thread pool overlaps them. Returns a context per log file path.
+        """
+        if not log_file_paths:
+            return {}
+        
+        max_workers = min(32, (os.cpu_count() or 1) * 4, len(log_file_paths))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            contexts = executor.map(self.analyze_project_context, log_file_paths)
+            return dict(zip(log_file_paths, contexts))
+    
+    def _manifest_signature(self, project_root: str) -> tuple:
+        """Modification times of the manifests a cached context depends on"""
+        signature = []
+        # Always stat() afresh: a manifest created later must invalidate the cache
+        for path in self._manifest_paths(project_root).values():
+            try:
+                signature.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+    
+    def _manifest_paths(self, project_root: str) -> Dict[str, str]:
+        """Manifest name -> full path under project_root, joined once per root"""
+        # LRU lookups reorder the cache, so even reads take the lock
+        with self._lock:
+            paths = self._manifest_path_cache.get(project_root)
+            if paths is None:
+                paths = {name: os.path.join(project_root, name) for name in self._MANIFEST_FILES}
+                self._manifest_path_cache[project_root] = paths
+        return paths
+    
+    def _find_project_root(self, log_file_path: str) -> Optional[str]:
+        """Find project root by looking for config files"""
+        log_dir = os.path.dirname(os.fspath(log_file_path)) or '.'
+        return _find_project_root(log_dir, self._root_markers)
+    
+    def _scan_root(self, project_root: str) -> Dict[str, bool]:
+        """List the project root once, mapping entry name to is-directory"""
+        scan = {}
+        try:
+            with os.scandir(project_root) as it:
+                for entry in it:
+                    try:
+                        scan[entry.name] = entry.is_dir()
+                    except OSError:
+                        scan[entry.name] = False
+        except OSError:
+            pass
+        return scan
     
-    def _detect_project_type(self, project_root: Path) -> Dict[str, Any]:
+    def _detect_project_type(self, scan: Dict[str, bool]) -> Dict[str, Any]:
         """Detect project type from config files"""
-        result = {'project_type': None, 'language': None}
-        
-        if (project_root / 'package.json').exists():
-            result['project_type'] = 'nodejs'
-            result['language'] = 'javascript'
-            
-            # Check if TypeScript
-            if (project_root / 'tsconfig.json').exists():
-                result['language'] = 'typescript'
-        
-        elif (project_root / 'requirements.txt').exists() or (project_root / 'setup.py').exists():
-            result['project_type'] = 'python'
-            result['language'] = 'python'
-        
-        elif (project_root / 'pom.xml').exists() or (project_root / 'build.gradle').exists():
-            result['project_type'] = 'java'
-            result['language'] = 'java'
-        
-        elif (project_root / 'Gemfile').exists():
-            result['project_type'] = 'ruby'
-            result['language'] = 'ruby'
-        
-        elif (project_root / 'go.mod').exists():
-            result['project_type'] = 'go'
-            result['language'] = 'go'
-        
-        elif (project_root / 'Cargo.toml').exists():
-            result['project_type'] = 'rust'
-            result['language'] = 'rust'
-        
-        return result
+        for marker, project_type, language in self._TYPE_MARKERS:
+            if marker in scan:
+                # Check if TypeScript
+                if language == 'javascript' and 'tsconfig.json' in scan:
+                    language = 'typescript'
+                return {'project_type': project_type, 'language': language}
+        
+        return {'project_type': None, 'language': None}
     
-    def _extract_dependencies(self, project_root: Path, project_type: str) -> Dict[str, str]:
+    def _extract_dependencies(self, project_root: str, project_type: str, scan: Dict[str, bool]) -> Dict[str, str]:
         """Extract project dependencies"""
         dependencies = {}
         
         try:
             if project_type == 'nodejs':
-                package_json = project_root / 'package.json'
-                if package_json.exists():
-                    with open(package_json, 'r') as f:
-                        data = json.load(f)
-                        dependencies = {
-                            **data.get('dependencies', {}),
-                            **data.get('devDependencies', {})
-                        }
+                if 'package.json' in scan:
+                    data = self._load_package_json(project_root)
+                    dependencies = {
+                        **data.get('dependencies', {}),
+                        **data.get('devDependencies', {})
+                    }
             
             elif project_type == 'python':
-                requirements = project_root / 'requirements.txt'
-                if requirements.exists():
-                    with open(requirements, 'r') as f:
-                        for line in f:
-                            line = line.strip()
-                            if line and not line.startswith('#'):
-                                # Parse package==version format
-                                parts = re.split(r'[=<>]', line)
-                                if parts:
-                                    dependencies[parts[0].strip()] = line
+                if 'requirements.txt' in scan:
+                    for line in self._read_bytes(self._manifest_paths(project_root)['requirements.txt']).decode().splitlines():
+                        # Parse package==version format
+                        match = self._REQ_RE.match(line)
+                        if match:
+                            dependencies[match.group(1)] = line.strip()
         
         except Exception as e:
             print(f"Error extracting dependencies: {e}")
         
         return dependencies
     
-    def _detect_testing_framework(self, project_root: Path, dependencies: Dict, language: str) -> Optional[str]:
+    def _detect_testing_framework(self, scan: Dict[str, bool], dependencies: Dict, language: str) -> Optional[str]:
         """Detect testing framework from dependencies"""
-        if language == 'javascript' or language == 'typescript':
-            if 'jest' in dependencies:
-                return 'jest'
-            elif 'mocha' in dependencies:
-                return 'mocha'
-            elif 'cypress' in dependencies:
-                return 'cypress'
-            elif 'vitest' in dependencies:
-                return 'vitest'
-        
-        elif language == 'python':
-            if 'pytest' in dependencies:
-                return 'pytest'
-            elif 'unittest' in dependencies or (project_root / 'tests').exists():
-                return 'unittest'
-        
-        elif language == 'java':
-            if (project_root / 'pom.xml').exists():
-                return 'junit'
-        
-        elif language == 'ruby':
-            if 'rspec' in dependencies:
-                return 'rspec'
+        for dependency, framework in self._FRAMEWORK_MARKERS.get(language, ()):
+            if dependency in dependencies:
+                return framework
+        
+        fallback = self._FRAMEWORK_FALLBACKS.get(language)
+        if fallback and fallback[0] in scan:
+            return fallback[1]
         
         return None
     
-    def _analyze_test_patterns(self, project_root: Path, language: str) -> List[Dict[str, Any]]:
+    def _analyze_test_patterns(self, project_root: str, language: str, scan: Dict[str, bool]) -> List[Dict[str, Any]]:
         """Analyze existing test patterns"""
-        patterns = []
-        
-        test_dirs = ['test', 'tests', '__tests__', 'spec']
-        
-        for test_dir in test_dirs:
-            test_path = project_root / test_dir
-            if test_path.exists() and test_path.is_dir():
-                # Count test files
-                test_files = list(test_path.rglob('*'))
-                test_files = [f for f in test_files if f.is_file()]
-                
-                patterns.append({
-                    'directory': test_dir,
-                    'file_count': len(test_files),
-                    'structure': 'found'
-                })
-        
-        return patterns
-    
-    def _detect_import_style(self, project_root: Path, language: str) -> Optional[str]:
-        """Detect import style (ESM, CommonJS, etc.)"""
-        if language in ['javascript', 'typescript']:
-            package_json = project_root / 'package.json'
-            if package_json.exists():
-                try:
-                    with open(package_json, 'r') as f:
-                        data = json.load(f)
-                        if data.get('type') == 'module':
-                            return 'esm'
-                        return 'commonjs'
-                except:
-                    pass
+        test_dirs = [d for d in self._TEST_DIR_CANDIDATES if scan.get(d)]
+        paths = [os.path.join(project_root, d) for d in test_dirs]
+        
+        # Walking test trees is I/O bound, so overlap the walks when several
+        # candidate directories exist (async isn't an option: callers are sync
+        # code running inside the server's event loop)
+        if len(paths) > 1:
+            with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+                file_counts = list(executor.map(self._count_files, paths))
+        else:
+            file_counts = [self._count_files(path) for path in paths]
+        
+        return [
+            {'directory': test_dir, 'file_count': file_count, 'structure': 'found'}
+            for test_dir, file_count in zip(test_dirs, file_counts)
+        ]
+    
+    def _count_files(self, path: str) -> int:
+        """Count files under path without materializing the listing"""
+        return sum(1 for _ in self._iter_files(path))
+    
+    def _iter_files(self, path: str, limit: Optional[int] = None):
+        """
+        Recursively yield (name, path) for files under path using os.scandir.
         
-        return None
+        DirEntry caches the file type from the directory listing, so no extra
+        stat is needed per entry. Symlinked directories are not followed.
+        Stops after limit files when given.
+        """
+        count = 0
+        stack = [path]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            yield entry.name, entry.path
+                            count += 1
+                            if limit is not None and count >= limit:
+                                return
+            except OSError:
+                continue
     
-    def _get_file_structure(self, project_root: Path, language: str) -> Dict[str, Any]:
-        """Get basic file structure"""
-        structure = {
-            'src_directory': None,
-            'test_directory': None,
-            'common_directories': []
-        }
+    def _read_bytes(self, path: str) -> bytes:
+        """Read a whole file"""
+        with open(path, 'rb') as f:
+            return f.read()
+    
+    def _load_package_json(self, project_root: str) -> Dict[str, Any]:
+        """Parse package.json once per analysis of a project root"""
+        with self._lock:
+            data = self._package_json_cache.get(project_root)
+        if data is None:
+            data = _json_loads(self._read_bytes(self._manifest_paths(project_root)['package.json']))
+            with self._lock:
+                self._package_json_cache[project_root] = data
+        return data
+    
+    def _detect_import_style(self, project_root: str, language: str, scan: Dict[str, bool]) -> Optional[str]:
+        """Detect import style (ESM, CommonJS, etc.)"""
+        if language not in ('javascript', 'typescript') or 'package.json' not in scan:
+            return None
         
-        # Common source directories
-        src_dirs = ['src', 'lib', 'app', 'source']
-        for src_dir in src_dirs:
-            if (project_root / src_dir).exists():
-                structure['src_directory'] = src_dir
-                break
-        
-        # Common test directories
-        test_dirs = ['test', 'tests', '__tests__', 'spec']
-        for test_dir in test_dirs:
-            if (project_root / test_dir).exists():
-                structure['test_directory'] = test_dir
-                break
-        
-        # List all top-level directories
+        # Only an unreadable or malformed file is expected to fail here
         try:
-            dirs = [d.name for d in project_root.iterdir() if d.is_dir() and not d.name.startswith('.')]
-            structure['common_directories'] = dirs[:10]  # Limit to 10
-        except:
-            pass
+            data = self._load_package_json(project_root)
+        except (OSError, ValueError):
+            return None
         
-        return structure
+        if not isinstance(data, dict):
+            return None
+        return 'esm' if data.get('type') == 'module' else 'commonjs'
+    
+    def _get_file_structure(self, language: str, scan: Dict[str, bool]) -> Dict[str, Any]:
+        """Get basic file structure"""
+        # Everything comes from the single root listing (name -> is_dir)
+        return {
+            # Common source directories
+            'src_directory': next((d for d in self._SRC_DIR_CANDIDATES if scan.get(d)), None),
+            # Common test directories
+            'test_directory': next((d for d in self._TEST_DIR_CANDIDATES if scan.get(d)), None),
+            # List all top-level directories
+            'common_directories': list(islice(  # Limit to 10, stopping early
+                (d for d, is_dir in scan.items() if is_dir and not d.startswith('.')), 10
+            ))
+        }
     
-    def _extract_conventions(self, project_root: Path, language: str) -> Dict[str, Any]:
+    def _extract_conventions(self, project_root: str, language: str, scan: Dict[str, bool]) -> Dict[str, Any]:
         """Extract naming and structure conventions"""
         conventions = {
             'naming': None,
@@ -281,26 +436,22 @@ class ContextAnalyzer:
         }
         
         # Detect test naming convention
-        test_dirs = ['test', 'tests', '__tests__', 'spec']
-        for test_dir in test_dirs:
-            test_path = project_root / test_dir
-            if test_path.exists():
-                try:
-                    test_files = list(test_path.rglob('*'))[:5]  # Sample 5 files
-                    for f in test_files:
-                        if f.is_file():
-                            if '_test' in f.name or '.test.' in f.name:
-                                conventions['test_naming'] = 'suffix'
-                            elif 'test_' in f.name or f.name.startswith('test'):
-                                conventions['test_naming'] = 'prefix'
-                            elif '_spec' in f.name or '.spec.' in f.name:
-                                conventions['test_naming'] = 'spec'
-                            break
-                except:
-                    pass
+        for test_dir in self._TEST_DIR_CANDIDATES:
+            if scan.get(test_dir):
+                # _iter_files skips unreadable directories itself
+                for name, _ in self._iter_files(os.path.join(project_root, test_dir), limit=5):  # Sample 5 files
+                    match = self._CONV_RE.match(name)
+                    if match:
+                        conventions['test_naming'] = match.lastgroup
+                    break
         
         return conventions
     
+    def is_test_file(self, path: str, language: str) -> bool:
+        """Check whether a file path looks like a test file for the language"""
+        pattern = self._test_file_re.get(language)
+        return bool(pattern and pattern.search(path))
+    
     def _get_default_context(self) -> Dict[str, Any]:
         """Return default context when project root can't be found"""
         return {
@@ -317,34 +468,10 @@ class ContextAnalyzer:
     
     def format_context_for_prompt(self, context: Dict[str, Any]) -> str:
         """Format context as a string for AI prompt"""
-        lines = []
-        
-        lines.append("PROJECT CONTEXT:")
-        
-        if context.get('project_type'):
-            lines.append(f"- Type: {context['project_type']}")
-        
-        if context.get('language'):
-            lines.append(f"- Language: {context['language']}")
-        
-        if context.get('testing_framework'):
-            lines.append(f"- Testing Framework: {context['testing_framework']}")
-        
-        if context.get('import_style'):
-            lines.append(f"- Import Style: {context['import_style']}")
-        
-        if context.get('file_structure', {}).get('src_directory'):
-            lines.append(f"- Source Directory: {context['file_structure']['src_directory']}")
-        
-        if context.get('file_structure', {}).get('test_directory'):
-            lines.append(f"- Test Directory: {context['file_structure']['test_directory']}")
-        
-        if context.get('dependencies'):
-            key_deps = list(context['dependencies'].keys())[:10]
-            lines.append(f"- Key Dependencies: {', '.join(key_deps)}")
-        
-        if context.get('conventions', {}).get('test_naming'):
-            lines.append(f"- Test Naming: {context['conventions']['test_naming']}")
-        
+        lines = ["PROJECT CONTEXT:"]
+        lines.extend(
+            f"- {label}: {value}"
+            for label, getter in self._PROMPT_FIELDS
+            if (value := getter(context))
+        )
         return '\n'.join(lines)
-
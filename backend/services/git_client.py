@@ -3,11 +3,108 @@ Git Client Service for ChaturLog
 Provides READ-ONLY access to Git repositories (GitHub, GitLab, Bitbucket)
 """
 
+import os
 import re
+import copy
 import json
-from typing import Optional, Dict, List, Any
-import requests
+import base64
+import shutil
+import logging
+import hashlib
+import threading
+import subprocess
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, List, Any, Iterator, Tuple, Union
+from cachetools import LRUCache, TTLCache
+import time
+import httpx
 from pathlib import Path
+from urllib.parse import quote
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # optional C-accelerated parser
+    _json_loads = json.loads
+
+try:
+    import brotli  # noqa: F401  (lets httpx decode Content-Encoding: br)
+    _ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    _ACCEPT_ENCODING = 'gzip, deflate'
+
+logger = logging.getLogger(__name__)
+
+
+# Entry types that denote files across providers (GitHub, GitLab, Bitbucket)
+_FILE_TYPES = frozenset({'file', 'blob', 'commit_file'})
+
+# Full or abbreviated commit sha, lowercase as git prints it (get_commit_info
+# lowercases its input; refs stay case-sensitive since a branch may look like hex)
+_SHA_RE = re.compile(r'[0-9a-f]{7,40}')
+
+# Inputs that end up in URLs (and local git commands) are checked before any
+# request: refs are plain git ref names that can't start an option or contain
+# '..'; paths may not contain '..' segments or control characters
+_REF_RE = re.compile(r'(?!-)(?!.*\.\.)[\w./-]+')
+_BAD_PATH_RE = re.compile(r'(?:^|/)\.\.(?:/|$)|[\x00-\x1f]')
+
+# Repositories are owner/name (GitLab also allows nested groups) with no
+# '.'/'..' segments, so one can't escape the local clone root
+_REPOSITORY_RE = re.compile(r'(?!\.\.?/)[\w.-]+(?:/(?!\.\.?(?:/|$))[\w.-]+)+')
+
+# Shared across clients and keyed by (provider, repository, token digest, ...):
+# reads pinned to a commit sha never change, while repository metadata is
+# only semi-static and expires after a few minutes
+_immutable_cache = LRUCache(maxsize=256)
+_connection_cache = TTLCache(maxsize=128, ttl=180)
+_cache_lock = threading.Lock()
+
+# Opt-in local clones (GitClient(local_clone=True)) live on the RAM disk when
+# there is one; fetches into them are serialized
+_LOCAL_CLONE_ROOT = Path('/dev/shm/chaturlog' if os.path.isdir('/dev/shm') else '~/.cache/chaturlog').expanduser()
+_clone_lock = threading.Lock()
+
+
+@dataclass(slots=True, frozen=True)
+class FileEntry:
+    """A file or directory entry in a repository listing"""
+    path: str
+    name: str
+    type: str  # provider-specific, e.g. 'file'/'dir', 'blob'/'tree', 'commit_file'
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {'path': self.path, 'name': self.name, 'type': self.type}
+
+
+@dataclass(slots=True, frozen=True)
+class CommitInfo:
+    """Commit metadata; immutable so cached instances can be shared"""
+    hash: str
+    short_hash: str
+    message: str
+    author: str
+    author_email: Optional[str]
+    date: str
+    files_changed: Tuple[str, ...] = ()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['files_changed'] = list(self.files_changed)
+        return data
+
+
+def _loads(response: httpx.Response) -> Any:
+    """Parse a JSON response body straight from its bytes"""
+    return _json_loads(response.content)
 
 
 class GitClient:
@@ -16,7 +113,43 @@ class GitClient:
     IMPORTANT: Only provides READ-ONLY access to repositories
     """
     
-    def __init__(self, provider: str, token: str, repository: str):
+    # Accept header for raw file bodies from the GitHub contents/blobs APIs
+    GITHUB_RAW = {'Accept': 'application/vnd.github.v3.raw'}
+    
+    # Conditional-request (ETag) cache size per client
+    ETAG_CACHE_SIZE = 512
+    
+    # Retries for transient statuses, with exponential backoff
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 0.3
+    
+    # Longest server-requested wait (Retry-After / rate-limit reset) honored, in
+    # seconds; callers are interactive, so longer limits fail fast instead
+    MAX_RETRY_WAIT = 5
+    
+    # Files per GitHub GraphQL request in get_files_batch (node limit headroom)
+    GRAPHQL_BATCH_SIZE = 50
+    
+    # Upper bound on concurrent API requests (e.g. sibling directory listings)
+    MAX_CONCURRENT_REQUESTS = 10
+    
+    # Git remotes for local clones, and how long a fetched branch/tag is trusted
+    CLONE_URLS = {
+        'github': 'https://github.com/{}.git',
+        'gitlab': 'https://gitlab.com/{}.git',
+        'bitbucket': 'https://bitbucket.org/{}.git'
+    }
+    LOCAL_REF_TTL = 180
+    
+    # `git ls-tree` object types mapped to each provider's listing types
+    LOCAL_TYPES = {
+        'github': {'blob': 'file', 'tree': 'dir', 'commit': 'submodule'},
+        'gitlab': {'blob': 'blob', 'tree': 'tree', 'commit': 'commit'},
+        'bitbucket': {'blob': 'commit_file', 'tree': 'commit_directory', 'commit': 'commit_file'}
+    }
+    
+    def __init__(self, provider: str, token: str, repository: str, local_clone: bool = False):
         """
         Initialize Git client
         
@@ -24,10 +157,14 @@ class GitClient:
             provider: Git provider ('github', 'gitlab', 'bitbucket')
             token: Personal access token (READ-ONLY permissions)
             repository: Repository in format 'org/repo'
+            local_clone: Serve file reads and listings from a shallow local
+                clone (one fetch per ref) instead of one API call each.
+                Worth it for workloads reading dozens of files; falls back
+                to the API when git is unavailable or the fetch fails.
         """
         self.provider = provider.lower()
         self.token = token
-        self.repository = repository
+        self.local_clone = local_clone and shutil.which('git') is not None
         
         # Validate provider
         if self.provider not in ['github', 'gitlab', 'bitbucket']:
@@ -41,9 +178,130 @@ class GitClient:
         }
         
         self.base_url = self.api_urls[self.provider]
+        self.repository = repository
+        
+        # Cache keys carry a digest of the token, never the token itself
+        self._token_key = hashlib.sha256(token.encode()).hexdigest()[:16]
+        
+        # Auth/Accept headers depend only on provider and token: build them once
+        self._headers = self._build_headers()
+        
+        # One pooled HTTP/2 client per GitClient: keep-alive connections (and
+        # their TLS handshakes) are reused, and concurrent requests such as
+        # sibling directory listings are multiplexed over a single connection
+        self.client = httpx.Client(
+            http2=_HTTP2,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+            # Tree/commit JSON compresses well; only advertise br when we can decode it
+            headers={**self._headers, 'Accept-Encoding': _ACCEPT_ENCODING},
+            follow_redirects=True,
+            transport=httpx.HTTPTransport(http2=_HTTP2, retries=3)  # connection errors
+        )
+        
+        # Last 200 response per (url, params, Accept) with its ETag, so repeat
+        # reads send If-None-Match and an unchanged resource costs a bodiless
+        # 304 (which doesn't count against GitHub's rate limit)
+        self._etag_cache: OrderedDict = OrderedDict()
+        self._etag_lock = threading.Lock()
+        
+        # ref -> (commit sha, fetched at) for refs fetched into the local clone
+        self._local_refs: Dict[str, Tuple[str, float]] = {}
+    
+    @property
+    def repository(self) -> str:
+        return self._repository
+    
+    @repository.setter
+    def repository(self, repository: str):
+        # Repository URL prefix built once (and again if the repository is
+        # reassigned) instead of re-encoding the path on every call
+        self._repository = repository
+        self._repo_enc = quote(repository, safe='')
+        self._repo_api = {
+            'github': f"{self.base_url}/repos/{repository}",
+            'gitlab': f"{self.base_url}/projects/{self._repo_enc}",
+            'bitbucket': f"{self.base_url}/repositories/{repository}"
+        }[self.provider]
+    
+    def close(self):
+        """Release pooled connections"""
+        self.client.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
         
-    def _get_headers(self) -> Dict[str, str]:
-        """Get authentication headers for API requests"""
+    def _get(self, url: str, params: Optional[Dict[str, Any]] = None,
+             headers: Optional[Dict[str, str]] = None, timeout: int = 10):
+        """GET through the pooled client, revalidating cached responses by ETag"""
+        accept = (headers or {}).get('Accept') or self._headers.get('Accept')
+        key = (url, tuple(sorted((params or {}).items())), accept)
+        
+        with self._etag_lock:
+            cached = self._etag_cache.get(key)
+        if cached is not None:
+            headers = {**(headers or {}), 'If-None-Match': cached[0]}
+        
+        for attempt in range(self.MAX_RETRIES + 1):
+            response = self.client.get(url, params=params, headers=headers, timeout=timeout)
+            delay = self._retry_delay(response, attempt)
+            if delay is None or attempt == self.MAX_RETRIES:
+                break
+            time.sleep(delay)
+        
+        if response.status_code == 304 and cached is not None:
+            with self._etag_lock:
+                self._etag_cache.move_to_end(key)
+            return cached[1]
+        
+        etag = response.headers.get('ETag')
+        if response.status_code == 200 and etag:
+            with self._etag_lock:
+                self._etag_cache[key] = (etag, response)
+                self._etag_cache.move_to_end(key)
+                if len(self._etag_cache) > self.ETAG_CACHE_SIZE:
+                    self._etag_cache.popitem(last=False)
+        return response
+    
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying response, or None if it shouldn't be retried"""
+        status = response.status_code
+        rate_limited = status == 403 and response.headers.get('X-RateLimit-Remaining') == '0'
+        if status not in self.RETRY_STATUSES and not rate_limited:
+            return None
+        
+        # Prefer the server's hint: Retry-After (seconds) or GitHub's reset epoch
+        delay = None
+        retry_after = response.headers.get('Retry-After')
+        reset = response.headers.get('X-RateLimit-Reset')
+        if retry_after and retry_after.isdigit():
+            delay = float(retry_after)
+        elif reset and reset.isdigit() and (status == 429 or rate_limited):
+            delay = max(0.0, int(reset) - time.time()) + 1
+        
+        if delay is None:
+            # A primary rate limit without a reset time won't clear by backing off
+            return None if rate_limited else self.RETRY_BACKOFF * (2 ** attempt)
+        # Don't block a request for an hour-long rate limit window
+        return delay if delay <= self.MAX_RETRY_WAIT else None
+    
+    @staticmethod
+    def _valid(path: str, ref: str = 'main') -> bool:
+        """Whether a repository path and ref are safe to send to the provider"""
+        if _BAD_PATH_RE.search(path) or not _REF_RE.fullmatch(ref):
+            logger.warning("Rejected invalid path or ref: %r @ %r", path, ref)
+            return False
+        return True
+    
+    def _cache_key(self, *parts) -> tuple:
+        """Key for the shared caches, scoped to provider, repository and token"""
+        return (self.provider, self.repository, self._token_key, *parts)
+    
+    def _build_headers(self) -> Dict[str, str]:
+        """Build authentication headers for API requests"""
         if self.provider == 'github':
             return {
                 'Authorization': f'token {self.token}',
@@ -79,10 +337,10 @@ class GitClient:
             elif self.provider == 'bitbucket':
                 url = f"{self.base_url}/user"
             
-            response = requests.get(url, headers=self._get_headers(), timeout=10)
+            response = self._get(url, timeout=10)
             
             if response.status_code == 200:
-                user_info = response.json()
+                user_info = _loads(response)
                 return {
                     'success': True,
                     'message': 'Token is valid',
@@ -104,7 +362,7 @@ class GitClient:
                     'message': f'Error: HTTP {response.status_code}',
                     'user_info': None
                 }
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             return {
                 'success': False,
                 'message': 'Connection timeout',
@@ -128,20 +386,26 @@ class GitClient:
                 'repository_info': dict or None
             }
         """
+        key = self._cache_key('connection')
+        with _cache_lock:
+            cached = _connection_cache.get(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
+        result = self._check_connection()
+        # Only successes are cached; failures may be transient
+        if result['success']:
+            with _cache_lock:
+                _connection_cache[key] = copy.deepcopy(result)
+        return result
+    
+    def _check_connection(self) -> Dict[str, Any]:
+        """Query the repository endpoint (uncached)"""
         try:
-            if self.provider == 'github':
-                url = f"{self.base_url}/repos/{self.repository}"
-            elif self.provider == 'gitlab':
-                # Encode repository path for GitLab
-                repo_path = self.repository.replace('/', '%2F')
-                url = f"{self.base_url}/projects/{repo_path}"
-            elif self.provider == 'bitbucket':
-                url = f"{self.base_url}/repositories/{self.repository}"
-            
-            response = requests.get(url, headers=self._get_headers(), timeout=10)
+            response = self._get(self._repo_api, timeout=10)
             
             if response.status_code == 200:
-                repo_info = response.json()
+                repo_info = _loads(response)
                 return {
                     'success': True,
                     'message': 'Connection successful',
@@ -171,7 +435,7 @@ class GitClient:
                     'message': f'Error: HTTP {response.status_code}',
                     'repository_info': None
                 }
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             return {
                 'success': False,
                 'message': 'Connection timeout',
@@ -195,42 +459,157 @@ class GitClient:
         Returns:
             File content as string or None if not found
         """
+        if not self._valid(file_path, ref):
+            return None
+        
+        # Content at a commit sha never changes; branch and tag refs can move
+        cacheable = bool(_SHA_RE.fullmatch(ref))
+        if cacheable:
+            key = self._cache_key('file', ref, file_path)
+            with _cache_lock:
+                cached = _immutable_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        content = self._fetch_file_content(file_path, ref)
+        if cacheable and content is not None:
+            with _cache_lock:
+                _immutable_cache[key] = content
+        return content
+    
+    def _fetch_file_content(self, file_path: str, ref: str = 'main') -> Optional[str]:
+        """Read file content from the provider (uncached)"""
         try:
+            sha = self._local_commit(ref)
+            if sha:
+                return self._read_local(sha, [file_path]).get(file_path)
+            
             if self.provider == 'github':
-                url = f"{self.base_url}/repos/{self.repository}/contents/{file_path}"
+                # Ask for the raw body instead of base64 wrapped in JSON
+                url = f"{self._repo_api}/contents/{quote(file_path)}"
                 params = {'ref': ref}
-                response = requests.get(url, headers=self._get_headers(), params=params, timeout=10)
+                response = self._get(url, params=params, headers=self.GITHUB_RAW, timeout=10)
                 
                 if response.status_code == 200:
-                    content_data = response.json()
-                    # GitHub returns base64 encoded content
-                    import base64
-                    content = base64.b64decode(content_data['content']).decode('utf-8')
-                    return content
+                    return response.content.decode('utf-8')
+                
+                # Files too large for the contents API are served by the blobs API
+                if response.status_code == 403 and 'too_large' in response.text:
+                    return self._fetch_github_blob(file_path, ref)
             
             elif self.provider == 'gitlab':
-                repo_path = self.repository.replace('/', '%2F')
-                file_path_encoded = file_path.replace('/', '%2F')
-                url = f"{self.base_url}/projects/{repo_path}/repository/files/{file_path_encoded}/raw"
+                # GitLab takes the path as one URL-encoded segment ('/' -> %2F)
+                file_path_encoded = quote(file_path, safe='')
+                url = f"{self._repo_api}/repository/files/{file_path_encoded}/raw"
                 params = {'ref': ref}
-                response = requests.get(url, headers=self._get_headers(), params=params, timeout=10)
+                response = self._get(url, params=params, timeout=10)
                 
                 if response.status_code == 200:
                     return response.text
             
             elif self.provider == 'bitbucket':
-                url = f"{self.base_url}/repositories/{self.repository}/src/{ref}/{file_path}"
-                response = requests.get(url, headers=self._get_headers(), timeout=10)
+                url = f"{self._repo_api}/src/{ref}/{quote(file_path)}"
+                response = self._get(url, timeout=10)
                 
                 if response.status_code == 200:
                     return response.text
             
             return None
         except Exception as e:
-            print(f"Error reading file {file_path}: {str(e)}")
+            logger.warning("Error reading file %s: %s", file_path, e, exc_info=True)
             return None
     
-    def list_files(self, path: str = '', ref: str = 'main', recursive: bool = False) -> List[Dict[str, Any]]:
+    def get_files_batch(self, file_paths: List[str], ref: str = 'main') -> Dict[str, str]:
+        """
+        Read many files from repository at once (READ-ONLY)
+        
+        On GitHub, files are fetched GRAPHQL_BATCH_SIZE at a time with a single
+        GraphQL query each (one aliased Blob lookup per path) instead of one
+        REST round trip per file. Other providers, and GitHub files GraphQL
+        can't return as text (binary or truncated), use get_file_content.
+        
+        Args:
+            file_paths: Paths to files in repository
+            ref: Branch, tag, or commit to read from (default: 'main')
+        
+        Returns:
+            Mapping of file path to content for the files that could be read
+        """
+        if not _REF_RE.fullmatch(ref):
+            return {}
+        file_paths = [path for path in file_paths if self._valid(path)]
+        
+        contents = {}
+        sha = self._local_commit(ref)
+        if sha:
+            contents = self._read_local(sha, file_paths)
+        elif self.provider == 'github':
+            for i in range(0, len(file_paths), self.GRAPHQL_BATCH_SIZE):
+                contents.update(self._fetch_github_files_graphql(file_paths[i:i + self.GRAPHQL_BATCH_SIZE], ref))
+        
+        remaining = [path for path in file_paths if path not in contents]
+        if remaining:
+            with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_REQUESTS) as executor:
+                contents.update(zip(remaining, executor.map(lambda p: self.get_file_content(p, ref), remaining)))
+        
+        return {path: content for path, content in contents.items() if content is not None}
+    
+    def _fetch_github_files_graphql(self, file_paths: List[str], ref: str) -> Dict[str, Optional[str]]:
+        """
+        Fetch up to GRAPHQL_BATCH_SIZE files' text in one GitHub GraphQL query
+        
+        Paths that don't exist at ref map to None; paths whose text GraphQL
+        can't provide are left out so the caller can fetch them over REST.
+        """
+        try:
+            owner, _, name = self.repository.partition('/')
+            # json.dumps yields a valid GraphQL string literal for the expression
+            fields = '\n'.join(
+                f'f{i}: object(expression: {json.dumps(f"{ref}:{path}")}) {{ ... on Blob {{ text isTruncated }} }}'
+                for i, path in enumerate(file_paths)
+            )
+            query = f'query($owner: String!, $name: String!) {{ repository(owner: $owner, name: $name) {{ {fields} }} }}'
+            
+            response = self.client.post(
+                f"{self.base_url}/graphql",
+                json={'query': query, 'variables': {'owner': owner, 'name': name}},
+                timeout=30
+            )
+            if response.status_code != 200:
+                return {}
+            
+            repository = (_loads(response).get('data') or {}).get('repository') or {}
+            contents = {}
+            for i, path in enumerate(file_paths):
+                blob = repository.get(f'f{i}')
+                if blob is None:
+                    contents[path] = None
+                elif blob.get('text') is not None and not blob.get('isTruncated'):
+                    contents[path] = blob['text']
+            return contents
+        except Exception as e:
+            logger.warning("Error batch reading files: %s", e, exc_info=True)
+            return {}
+    
+    def _fetch_github_blob(self, file_path: str, ref: str) -> Optional[str]:
+        """Read a large GitHub file through the blobs API, by sha from its directory listing"""
+        directory, _, name = file_path.rpartition('/')
+        url = f"{self._repo_api}/contents/{quote(directory)}"
+        response = self._get(url, params={'ref': ref}, timeout=10)
+        if response.status_code != 200:
+            return None
+        
+        sha = next((item['sha'] for item in _loads(response) if item['name'] == name), None)
+        if not sha:
+            return None
+        
+        url = f"{self._repo_api}/git/blobs/{sha}"
+        response = self._get(url, headers=self.GITHUB_RAW, timeout=30)
+        if response.status_code == 200:
+            return response.content.decode('utf-8')
+        return None
+    
+    def list_files(self, path: str = '', ref: str = 'main', recursive: bool = False) -> List[FileEntry]:
         """
         List files in repository directory (READ-ONLY)
         
@@ -240,65 +619,121 @@ class GitClient:
             recursive: If True, list all files recursively
         
         Returns:
-            List of file objects with 'path', 'type', 'name'
+            List of FileEntry objects (path, name, type)
+        """
+        return list(self.iter_files(path, ref, recursive))
+    
+    def iter_files(self, path: str = '', ref: str = 'main', recursive: bool = False) -> Iterator[FileEntry]:
+        """
+        Iterate over files in repository directory (READ-ONLY)
+        
+        Same entries as list_files, yielded one at a time so large listings
+        never have to be held in memory at once.
+        
+        Args:
+            path: Directory path (empty for root)
+            ref: Branch, tag, or commit
+            recursive: If True, list all files recursively
+        
+        Yields:
+            FileEntry objects (path, name, type)
         """
+        if not self._valid(path, ref):
+            return
+        
         try:
-            if self.provider == 'github':
-                url = f"{self.base_url}/repos/{self.repository}/contents/{path}"
-                params = {'ref': ref}
-                response = requests.get(url, headers=self._get_headers(), params=params, timeout=10)
+            sha = self._local_commit(ref)
+            if sha:
+                yield from self._list_local(sha, path, recursive)
+            
+            elif self.provider == 'github':
+                if not recursive:
+                    yield from self._list_github_dir(path, ref)
+                    return
                 
-                if response.status_code == 200:
-                    contents = response.json()
-                    files = []
-                    for item in contents:
-                        files.append({
-                            'path': item['path'],
-                            'name': item['name'],
-                            'type': item['type']  # 'file' or 'dir'
-                        })
-                        
-                        # Recursively get files in subdirectories
-                        if recursive and item['type'] == 'dir':
-                            files.extend(self.list_files(item['path'], ref, recursive=True))
-                    
-                    return files
+                # Whole tree in one request; crawl only if GitHub truncated it
+                response = self._get(f"{self._repo_api}/git/trees/{ref}", params={'recursive': 1}, timeout=10)
+                if response.status_code != 200:
+                    return
+                
+                data = _loads(response)
+                if data.get('truncated'):
+                    yield from self._crawl_github_dir(path, ref)
+                else:
+                    yield from self._iter_github_tree(data, path)
             
             elif self.provider == 'gitlab':
-                repo_path = self.repository.replace('/', '%2F')
-                url = f"{self.base_url}/projects/{repo_path}/repository/tree"
+                url = f"{self._repo_api}/repository/tree"
                 params = {'ref': ref, 'path': path, 'recursive': recursive}
-                response = requests.get(url, headers=self._get_headers(), params=params, timeout=10)
+                response = self._get(url, params=params, timeout=10)
                 
                 if response.status_code == 200:
-                    tree = response.json()
-                    return [{
-                        'path': item['path'],
-                        'name': item['name'],
-                        'type': item['type']  # 'blob' (file) or 'tree' (dir)
-                    } for item in tree]
+                    for item in _loads(response):
+                        yield FileEntry(
+                            path=item['path'],
+                            name=item['name'],
+                            type=item['type']  # 'blob' (file) or 'tree' (dir)
+                        )
             
             elif self.provider == 'bitbucket':
-                url = f"{self.base_url}/repositories/{self.repository}/src/{ref}/{path}"
-                response = requests.get(url, headers=self._get_headers(), timeout=10)
+                url = f"{self._repo_api}/src/{ref}/{quote(path)}"
+                response = self._get(url, timeout=10)
                 
                 if response.status_code == 200:
-                    data = response.json()
-                    files = []
-                    for item in data.get('values', []):
-                        files.append({
-                            'path': item['path'],
-                            'name': item['path'].split('/')[-1],
-                            'type': item['type']  # 'commit_file' or 'commit_directory'
-                        })
-                    return files
+                    for item in _loads(response).get('values', []):
+                        yield FileEntry(
+                            path=item['path'],
+                            name=item['path'].split('/')[-1],
+                            type=item['type']  # 'commit_file' or 'commit_directory'
+                        )
+        except Exception as e:
+            logger.warning("Error listing files in %s: %s", path, e, exc_info=True)
+    
+    def _iter_github_tree(self, data: Dict[str, Any], path: str) -> Iterator[FileEntry]:
+        """Yield entries under path from a recursive git trees API response"""
+        prefix = f"{path.strip('/')}/" if path.strip('/') else ''
+        tree_types = {'blob': 'file', 'tree': 'dir', 'commit': 'submodule'}
+        for item in data.get('tree', []):
+            if item['path'].startswith(prefix):
+                yield FileEntry(
+                    path=item['path'],
+                    name=item['path'].rsplit('/', 1)[-1],
+                    type=tree_types.get(item['type'], item['type'])  # 'file' or 'dir'
+                )
+    
+    def _crawl_github_dir(self, path: str, ref: str) -> Iterator[FileEntry]:
+        """Recursively list path via the contents API, one level at a time"""
+        level = [path]
+        # Fetch all sibling directories of a level concurrently over the pooled client
+        with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_REQUESTS) as executor:
+            while level:
+                next_level = []
+                for entries in executor.map(lambda p: self._list_github_dir(p, ref), level):
+                    yield from entries
+                    # Recursively get files in subdirectories
+                    next_level.extend(entry.path for entry in entries if entry.type == 'dir')
+                level = next_level
+    
+    def _list_github_dir(self, path: str, ref: str) -> List[FileEntry]:
+        """List a single GitHub directory via the contents API"""
+        try:
+            url = f"{self._repo_api}/contents/{quote(path)}"
+            params = {'ref': ref}
+            response = self._get(url, params=params, timeout=10)
+            
+            if response.status_code == 200:
+                return [FileEntry(
+                    path=item['path'],
+                    name=item['name'],
+                    type=item['type']  # 'file' or 'dir'
+                ) for item in _loads(response)]
             
             return []
         except Exception as e:
-            print(f"Error listing files in {path}: {str(e)}")
+            logger.warning("Error listing files in %s: %s", path, e, exc_info=True)
             return []
     
-    def get_commit_info(self, commit_hash: str) -> Optional[Dict[str, Any]]:
+    def get_commit_info(self, commit_hash: str) -> Optional[CommitInfo]:
         """
         Get commit information (READ-ONLY)
         
@@ -306,93 +741,118 @@ class GitClient:
             commit_hash: Full or short commit hash
         
         Returns:
-            Commit info dict or None
+            CommitInfo or None
         """
+        # Hashes taken from logs may be uppercase; providers and the cache use lowercase
+        commit_hash = commit_hash.lower()
+        if not _SHA_RE.fullmatch(commit_hash):
+            return None
+        
+        # Commits are immutable, so lookups by sha are served from the cache
+        key = self._cache_key('commit', commit_hash)
+        with _cache_lock:
+            cached = _immutable_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        info = self._fetch_commit_info(commit_hash)
+        if info is not None:
+            with _cache_lock:
+                _immutable_cache[key] = info
+        return info
+    
+    def _fetch_commit_info(self, commit_hash: str) -> Optional[CommitInfo]:
+        """Fetch commit information from the provider (uncached)"""
         try:
             if self.provider == 'github':
-                url = f"{self.base_url}/repos/{self.repository}/commits/{commit_hash}"
-                response = requests.get(url, headers=self._get_headers(), timeout=10)
+                url = f"{self._repo_api}/commits/{commit_hash}"
+                response = self._get(url, timeout=10)
                 
                 if response.status_code == 200:
-                    commit = response.json()
-                    return {
-                        'hash': commit['sha'],
-                        'short_hash': commit['sha'][:7],
-                        'message': commit['commit']['message'],
-                        'author': commit['commit']['author']['name'],
-                        'author_email': commit['commit']['author']['email'],
-                        'date': commit['commit']['author']['date'],
-                        'files_changed': [f['filename'] for f in commit.get('files', [])]
-                    }
+                    commit = _loads(response)
+                    return CommitInfo(
+                        hash=commit['sha'],
+                        short_hash=commit['sha'][:7],
+                        message=commit['commit']['message'],
+                        author=commit['commit']['author']['name'],
+                        author_email=commit['commit']['author']['email'],
+                        date=commit['commit']['author']['date'],
+                        files_changed=tuple(f['filename'] for f in commit.get('files', []))
+                    )
             
             elif self.provider == 'gitlab':
-                repo_path = self.repository.replace('/', '%2F')
-                url = f"{self.base_url}/projects/{repo_path}/repository/commits/{commit_hash}"
-                response = requests.get(url, headers=self._get_headers(), timeout=10)
+                url = f"{self._repo_api}/repository/commits/{commit_hash}"
+                response = self._get(url, timeout=10)
                 
                 if response.status_code == 200:
-                    commit = response.json()
-                    return {
-                        'hash': commit['id'],
-                        'short_hash': commit['short_id'],
-                        'message': commit['message'],
-                        'author': commit['author_name'],
-                        'author_email': commit['author_email'],
-                        'date': commit['created_at'],
-                        'files_changed': []  # GitLab requires separate API call for diffs
-                    }
+                    commit = _loads(response)
+                    return CommitInfo(
+                        hash=commit['id'],
+                        short_hash=commit['short_id'],
+                        message=commit['message'],
+                        author=commit['author_name'],
+                        author_email=commit['author_email'],
+                        date=commit['created_at'],
+                        files_changed=()  # GitLab requires separate API call for diffs
+                    )
             
             elif self.provider == 'bitbucket':
-                url = f"{self.base_url}/repositories/{self.repository}/commit/{commit_hash}"
-                response = requests.get(url, headers=self._get_headers(), timeout=10)
+                url = f"{self._repo_api}/commit/{commit_hash}"
+                response = self._get(url, timeout=10)
                 
                 if response.status_code == 200:
-                    commit = response.json()
-                    return {
-                        'hash': commit['hash'],
-                        'short_hash': commit['hash'][:7],
-                        'message': commit['message'],
-                        'author': commit['author']['user']['display_name'],
-                        'author_email': commit['author']['user'].get('email'),
-                        'date': commit['date'],
-                        'files_changed': []
-                    }
+                    commit = _loads(response)
+                    return CommitInfo(
+                        hash=commit['hash'],
+                        short_hash=commit['hash'][:7],
+                        message=commit['message'],
+                        author=commit['author']['user']['display_name'],
+                        author_email=commit['author']['user'].get('email'),
+                        date=commit['date'],
+                        files_changed=()
+                    )
             
             return None
         except Exception as e:
-            print(f"Error getting commit info for {commit_hash}: {str(e)}")
+            logger.warning("Error getting commit info for %s: %s", commit_hash, e, exc_info=True)
             return None
     
-    def search_files(self, query: str, extension: str = None) -> List[Dict[str, Any]]:
+    def search_files(self, query: str, extension: Union[str, Tuple[str, ...], None] = None) -> List[FileEntry]:
         """
         Search for files in repository (READ-ONLY)
         
         Args:
             query: Search query (file name or content)
-            extension: Optional file extension filter (e.g., '.java', '.py')
+            extension: Optional file extension filter (e.g., '.java', or a tuple like ('.ts', '.tsx'))
         
         Returns:
             List of matching files
         """
         try:
-            # Simple implementation: list all files and filter
-            # For production, use provider-specific search APIs
-            all_files = self.list_files(recursive=True)
+            # Provider code search can't stand in for the listing: GitHub's
+            # in:path matches whole tokens on the default branch only, GitLab
+            # caps filename matches per request and Bitbucket searches file
+            # contents, so each would silently drop path substring matches
+            candidates = self.iter_files(recursive=True)
             
-            matching_files = []
-            for file in all_files:
-                if file['type'] in ['file', 'blob', 'commit_file']:
-                    # Filter by extension if specified
-                    if extension and not file['path'].endswith(extension):
-                        continue
-                    
-                    # Filter by query (case-insensitive)
-                    if query.lower() in file['name'].lower() or query.lower() in file['path'].lower():
-                        matching_files.append(file)
+            # Normalize filters once; str.endswith accepts a tuple of suffixes
+            q = query.lower()
+            suffixes = (extension,) if isinstance(extension, str) else tuple(extension or ())
             
-            return matching_files
+            # Keyed by path to drop duplicate hits (first occurrence wins).
+            # A file's name is the last segment of its path, so matching the
+            # lowercased path covers both the name and the path
+            matching_files = {}
+            for file in candidates:
+                path = file.path
+                if (file.type in _FILE_TYPES
+                        and (not suffixes or path.endswith(suffixes))
+                        and q in path.lower()):
+                    matching_files.setdefault(path, file)
+            
+            return list(matching_files.values())
         except Exception as e:
-            print(f"Error searching files: {str(e)}")
+            logger.warning("Error searching files: %s", e, exc_info=True)
             return []
     
     def get_repository_info(self) -> Optional[Dict[str, Any]]:
@@ -406,6 +866,165 @@ class GitClient:
         if connection_result['success']:
             return connection_result['repository_info']
         return None
+    
+    def fetch_overview(self, ref: str = 'main') -> Dict[str, Any]:
+        """
+        Fetch repository info, languages and top-level files concurrently (READ-ONLY)
+        
+        The requests are independent, so they overlap on the pooled client and
+        cost roughly one round trip instead of three.
+        
+        Args:
+            ref: Branch, tag, or commit for the root listing
+        
+        Returns:
+            {
+                'connection': test_connection() result,
+                'languages': {language: bytes (GitHub) or percentage (GitLab)},
+                'root': List of FileEntry objects
+            }
+        """
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {
+                'connection': executor.submit(self.test_connection),
+                'languages': executor.submit(self._get_languages),
+                'root': executor.submit(self.list_files, '', ref, False)
+            }
+            return {name: future.result() for name, future in futures.items()}
+    
+    def _get_languages(self) -> Dict[str, float]:
+        """Language breakdown for the repository ({} if unavailable)"""
+        try:
+            # GitHub reports bytes per language, GitLab percentages; Bitbucket
+            # only exposes a single 'language' on the repository
+            if self.provider not in ('github', 'gitlab'):
+                return {}
+            
+            response = self._get(f"{self._repo_api}/languages", timeout=10)
+            if response.status_code == 200:
+                return _loads(response)
+            return {}
+        except Exception as e:
+            logger.warning("Error getting languages: %s", e, exc_info=True)
+            return {}
+    
+    def _local_commit(self, ref: str) -> Optional[str]:
+        """Commit sha for ref in the local clone, fetching it if needed (None if unavailable)"""
+        if not self.local_clone or not self._valid_repository():
+            return None
+        
+        cached = self._local_refs.get(ref)
+        # Commits are immutable; branches and tags are re-fetched once stale
+        if cached and ((_SHA_RE.fullmatch(ref) and cached[0].startswith(ref))
+                       or time.time() - cached[1] < self.LOCAL_REF_TTL):
+            return cached[0]
+        
+        local_ref = f"refs/chaturlog/{hashlib.sha1(ref.encode()).hexdigest()[:16]}"
+        with _clone_lock:
+            if not (self._clone_dir / 'HEAD').exists():
+                self._clone_dir.mkdir(parents=True, exist_ok=True)
+                if self._git('init', '--bare', '--quiet') is None:
+                    return None
+            # Shallow fetch of just this ref; full sha refs work on GitHub/GitLab
+            fetched = self._git('fetch', '--depth=1', '--no-tags', '--quiet',
+                                self.CLONE_URLS[self.provider].format(self.repository),
+                                f"+{ref}:{local_ref}", timeout=300)
+        sha = self._git('rev-parse', '--verify', '--quiet', local_ref) if fetched is not None else None
+        if not sha:
+            return None
+        
+        sha = sha.decode().strip()
+        self._local_refs[ref] = (sha, time.time())
+        return sha
+    
+    def _valid_repository(self) -> bool:
+        """Whether the repository name is safe to use as a clone path and remote"""
+        if _REPOSITORY_RE.fullmatch(self.repository) and (self.provider == 'gitlab' or self.repository.count('/') == 1):
+            return True
+        logger.warning("Rejected invalid repository for local clone: %r", self.repository)
+        return False
+    
+    @property
+    def _clone_dir(self) -> Path:
+        return _LOCAL_CLONE_ROOT / self.provider / self.repository
+    
+    def _git(self, *args: str, input: Optional[bytes] = None, timeout: int = 60) -> Optional[bytes]:
+        """Run git against the local clone; stdout, or None on failure"""
+        # Credentials go through the environment so they never reach the
+        # clone's config or the process list
+        user = {'github': 'x-access-token', 'gitlab': 'oauth2', 'bitbucket': 'x-token-auth'}[self.provider]
+        basic = base64.b64encode(f"{user}:{self.token}".encode()).decode()
+        env = {
+            **os.environ,
+            'GIT_TERMINAL_PROMPT': '0',
+            'GIT_CONFIG_COUNT': '1',
+            'GIT_CONFIG_KEY_0': 'http.extraHeader',
+            'GIT_CONFIG_VALUE_0': f"Authorization: Basic {basic}"
+        }
+        try:
+            result = subprocess.run(['git', '--git-dir', str(self._clone_dir), *args],
+                                    input=input, capture_output=True, env=env, timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.warning("Error running git %s: %s", args[0], e)
+            return None
+        if result.returncode != 0:
+            logger.warning("git %s failed: %s", args[0], result.stderr.decode(errors='replace').strip())
+            return None
+        return result.stdout
+    
+    def _read_local(self, sha: str, file_paths: List[str]) -> Dict[str, Optional[str]]:
+        """Read files at sha from the local clone with one `git cat-file --batch`"""
+        out = self._git('cat-file', '--batch', input=''.join(f"{sha}:{p}\n" for p in file_paths).encode())
+        if out is None:
+            return {}
+        
+        contents = {}
+        pos = 0
+        for file_path in file_paths:
+            end = out.index(b'\n', pos)
+            header = out[pos:end]
+            pos = end + 1
+            # "<oid> <type> <size>" followed by the body, or "<object> missing"
+            if header.endswith((b' missing', b' ambiguous')):
+                contents[file_path] = None
+                continue
+            _, object_type, size = header.split()
+            body = out[pos:pos + int(size)]
+            pos += int(size) + 1
+            try:
+                contents[file_path] = body.decode('utf-8') if object_type == b'blob' else None
+            except UnicodeDecodeError:
+                contents[file_path] = None
+        return contents
+    
+    def _list_local(self, sha: str, path: str, recursive: bool) -> Iterator[FileEntry]:
+        """List path at sha from the local clone with `git ls-tree`"""
+        path = path.strip('/')
+        args = ['ls-tree', '-z', '--full-tree']
+        if recursive:
+            args += ['-r', '-t']
+        args.append(sha)
+        if path:
+            args.append(f"{path}/")
+        
+        out = self._git(*args)
+        if out is None:
+            return
+        
+        types = self.LOCAL_TYPES[self.provider]
+        prefix = f"{path}/" if path else ''
+        for record in out.decode('utf-8', errors='replace').split('\0'):
+            if not record:
+                continue
+            # "<mode> <type> <object>\t<path>"
+            meta, _, entry_path = record.partition('\t')
+            if entry_path.startswith(prefix):
+                entry_type = meta.split(' ')[1]
+                yield FileEntry(
+                    path=entry_path,
+                    name=entry_path.rsplit('/', 1)[-1],
+                    type=types.get(entry_type, entry_type)
+                )
 
 
 # Example usage and testing
@@ -425,7 +1044,7 @@ if __name__ == "__main__":
     # 
     # # List files
     # files = client.list_files('src', recursive=False)
-    # print(f"Files in src/: {[f['name'] for f in files[:10]]}")
+    # print(f"Files in src/: {[f.name for f in files[:10]]}")
     
     print("GitClient service ready for use")
     print("Providers supported: GitHub, GitLab, Bitbucket")
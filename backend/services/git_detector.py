@@ -3,8 +3,173 @@ Git Repository Detector for ChaturLog
 Automatically detects Git repository information from log files
 """
 
+import os
 import re
-from typing import Optional, Dict, List
+import copy
+import mmap
+import string
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Optional, Dict, List, Set, Tuple, Union
+
+try:
+    import hyperscan  # optional: single-pass multi-pattern prefilter
+except ImportError:
+    hyperscan = None
+
+
+@lru_cache(maxsize=8)
+def _compile_prefilter(specs: Tuple[Tuple[str, int], ...], utf8: bool = True) -> Optional['hyperscan.Database']:
+    """
+    Compile (pattern, re flags) pairs into one hyperscan database (None if unsupported)
+    
+    utf8 selects str semantics (input is encoded text); otherwise patterns
+    match raw bytes like bytes-mode re.
+    """
+    # PREFILTER makes hyperscan report a superset of the re matches, so a
+    # pattern it doesn't report can't match and its re.search is skipped
+    base = hyperscan.HS_FLAG_PREFILTER | hyperscan.HS_FLAG_SINGLEMATCH
+    if utf8:
+        base |= hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+    flags = [
+        base
+        | (hyperscan.HS_FLAG_CASELESS if re_flags & re.IGNORECASE else 0)
+        | (hyperscan.HS_FLAG_DOTALL if re_flags & re.DOTALL else 0)
+        | (hyperscan.HS_FLAG_MULTILINE if re_flags & re.MULTILINE else 0)
+        for _, re_flags in specs
+    ]
+    try:
+        db = hyperscan.Database()
+        db.compile(expressions=[pattern.encode() for pattern, _ in specs],
+                   ids=list(range(len(specs))), elements=len(specs), flags=flags)
+        return db
+    except Exception:
+        return None
+
+
+# Log text as passed in (str) or as read from disk (bytes / mmap)
+LogContent = Union[str, bytes, mmap.mmap]
+
+# Detection result dict (see GitRepositoryDetector.detect_repository)
+DetectionResult = Dict[str, Any]
+
+# Result fields before anything is detected (detection_methods, being
+# mutable, is added per result); read-only so no caller can alter it
+_EMPTY_RESULT = MappingProxyType({
+    'repository': None,
+    'repository_url': None,
+    'git_service': None,
+    'commit_hash': None,
+    'branch': None,
+    'confidence': 'none'
+})
+
+# Repository URLs and CI variables are nearly always near the top of a log,
+# so detection tries this much of it (about 64 KiB of text) first
+HEAD_SCAN_BYTES = 64 * 1024
+
+# Service name -> repository name helpers
+_UNDERSCORE_TO_DASH = str.maketrans('_', '-')
+# Uppercase with dashes in one pass (ASCII names only; str.upper handles the rest)
+_UPPER_DASH = str.maketrans(string.ascii_lowercase + '_', string.ascii_uppercase + '-')
+_SERVICE_SUFFIX_RE = re.compile(r'[_-](?:server|service|api|app)\Z')
+
+# Service names counted by _infer_service_from_log, for str and bytes logs
+_SERVICE_NEEDLES = {False: ('github', 'gitlab', 'bitbucket'), True: (b'github', b'gitlab', b'bitbucket')}
+
+# Lowercase literals at least one of which a pattern's match must contain;
+# without hyperscan these rule patterns out with plain substring checks
+_LITERAL_GATES = {
+    'https_url': ('http',),
+    'ssh_url': ('git@',),
+    'org_repo': ('github', 'gitlab', 'bitbucket', 'repo', 'project'),
+    'repo_name': ('deploying', 'building', 'repo'),
+    'service_name': ('name', 'service', 'app'),
+    'ci_env': ('github_repository', 'ci_project_', 'travis_repo_slug'),
+    'circle_user': ('circle_project_username',),
+    'circle_repo': ('circle_project_reponame',),
+    'commit_hash': ('commit', 'sha', 'revision'),
+    'branch': ('branch', 'ref'),
+    'docker_image': ('image', 'pulling', 'built from'),
+    'java_package': ('com.', 'org.', 'io.'),
+}
+_LITERAL_GATES_B = {name: tuple(g.encode() for g in gates) for name, gates in _LITERAL_GATES.items()}
+
+# hyperscan scratch space can't be shared between threads
+_hs_local = threading.local()
+
+
+def _text(value: Union[str, bytes]) -> str:
+    """Captured text as str (bytes captures come from mmap/bytes scans)"""
+    return value.decode('utf-8', 'replace') if isinstance(value, bytes) else value
+
+
+# Patterns for detecting Git repositories, compiled once at import
+_PATTERNS = {
+    # Direct URLs - Updated to handle multi-level paths like mindtickle/migrated-call-ai/apollo-server
+    'https_url': re.compile(r'https?://(?:github\.com|gitlab\.com|bitbucket\.org|dev\.azure\.com)/([\w-]+(?:/[\w-]+)+?)(?:\.git|\s|$)', re.IGNORECASE),
+    'ssh_url': re.compile(r'git@(?:github\.com|gitlab\.com|bitbucket\.org):([\w-]+(?:/[\w-]+)+?)(?:\.git|\s|$)', re.IGNORECASE),
+    
+    # Repository names, captured whole as 'org/repo'
+    'org_repo': re.compile(r'(?:github|gitlab|bitbucket|repository|repo|project):\s*([a-zA-Z0-9_-]+/[a-zA-Z0-9_.-]+)', re.IGNORECASE),
+    'repo_name': re.compile(r'(?:deploying|building|repository:|repo:)\s+([a-zA-Z0-9_-]+/[a-zA-Z0-9_.-]+)', re.IGNORECASE),
+    
+    # Service names (e.g., {"name":"APOLLO_SERVER"})
+    # JSON field, environment variable and log label fused into one scan
+    'service_name': re.compile(
+        r'["\']name["\']\s*:\s*["\'](?=(?P<json>[A-Z_]+))(?P=json)["\']'
+        r'|SERVICE_NAME[=\s]+(?P<env>[A-Z_-]+)'
+        r'|(?:Service|App|Application):\s*(?P<log>[A-Z_-]+)',
+        re.IGNORECASE
+    ),
+    
+    # CI/CD Environment Variables, fused into one scan; the named group
+    # that matched (match.lastgroup) holds 'org/repo' and says which
+    # variable it was (see CI_ENV_VARS)
+    'ci_env': re.compile(
+        r'GITHUB_REPOSITORY[=\s]+(?P<github_repo_env>[a-zA-Z0-9_-]+/[a-zA-Z0-9_.-]+)'
+        r'|CI_PROJECT_PATH[=\s]+(?P<gitlab_project>[a-zA-Z0-9_-]+/[a-zA-Z0-9_.-]+)'
+        r'|CI_PROJECT_URL[=\s]+https?://gitlab\.com/(?P<gitlab_url>[a-zA-Z0-9_-]+/[a-zA-Z0-9_.-]+)'
+        r'|TRAVIS_REPO_SLUG[=\s]+(?P<travis_ci>[a-zA-Z0-9_-]+/[a-zA-Z0-9_.-]+)',
+        re.IGNORECASE
+    ),
+    # CircleCI sets org and repo in separate variables; each is found with
+    # its own linear scan and combined (see _handle_circle_ci)
+    'circle_user': re.compile(r'CIRCLE_PROJECT_USERNAME[=\s]+([a-zA-Z0-9_-]+)', re.IGNORECASE),
+    'circle_repo': re.compile(r'CIRCLE_PROJECT_REPONAME[=\s]+([a-zA-Z0-9_.-]+)', re.IGNORECASE),
+    
+    # Commit hashes: the hex run is taken whole (the lookahead acts as an
+    # atomic group, so it's never backtracked) and must end there
+    'commit_hash': re.compile(r'(?:commit|sha|revision)[:\s]+(?=([a-f0-9]{7,40}))\1(?![a-f0-9])', re.IGNORECASE),
+    
+    # Branch names (without a refs/heads/ prefix)
+    'branch': re.compile(r'(?:branch|ref)[:\s]+(?:refs/heads/)?([\w/-]+)', re.IGNORECASE),
+    
+    # Docker images ('org/repo' and tag)
+    'docker_image': re.compile(r'(?:image|pulling|built from)[:\s]+([a-zA-Z0-9_-]+/[a-zA-Z0-9_.-]+):([a-zA-Z0-9_.-]+)', re.IGNORECASE),
+    
+    # Package names (Java, Python, etc.), only where a line starts with
+    # one (stack frames, imports): anchoring lets the scan reject all
+    # other offsets immediately and skips mid-line hostnames
+    'java_package': re.compile(r'^[ \t]*(?:at[ \t]+|import[ \t]+|package[ \t]+)?(?:com|org|io)\.([a-zA-Z0-9]+)\.([a-zA-Z0-9]+)', re.IGNORECASE | re.MULTILINE)
+}
+
+# Same patterns for scanning raw bytes (mmap'd files)
+_PATTERNS_B = {name: re.compile(p.pattern.encode(), p.flags & ~re.UNICODE) for name, p in _PATTERNS.items()}
+
+# detect_multiple_repositories: pattern -> confidence, in listing order, and
+# the patterns fused into one scan (the named group says which one matched)
+_MULTI_REPO_KINDS = {'https_url': 'very_high', 'ssh_url': 'very_high', 'docker_image': 'high'}
+_MULTI_REPO_RE = re.compile(
+    '|'.join(f"(?P<{kind}>{_PATTERNS[kind].pattern})" for kind in _MULTI_REPO_KINDS),
+    re.IGNORECASE
+)
+
+# Docker tag that is itself a commit hash
+_HEX_COMMIT_RE = re.compile(r'[a-f0-9]{7,40}')
 
 
 class GitRepositoryDetector:
@@ -13,43 +178,103 @@ class GitRepositoryDetector:
     Uses multiple pattern matching strategies
     """
     
-    def __init__(self):
-        # Patterns for detecting Git repositories
-        self.patterns = {
-            # Direct URLs - Updated to handle multi-level paths like mindtickle/migrated-call-ai/apollo-server
-            'https_url': re.compile(r'https?://(?:github\.com|gitlab\.com|bitbucket\.org|dev\.azure\.com)/([\w-]+(?:/[\w-]+)+?)(?:\.git|\s|$)', re.IGNORECASE),
-            'ssh_url': re.compile(r'git@(?:github\.com|gitlab\.com|bitbucket\.org):([\w-]+(?:/[\w-]+)+?)(?:\.git|\s|$)', re.IGNORECASE),
-            
-            # Repository names
-            'org_repo': re.compile(r'(?:github|gitlab|bitbucket|repository|repo|project):\s*([a-zA-Z0-9_-]+)/([a-zA-Z0-9_.-]+)', re.IGNORECASE),
-            'repo_name': re.compile(r'(?:deploying|building|repository:|repo:)\s+([a-zA-Z0-9_-]+)/([a-zA-Z0-9_.-]+)', re.IGNORECASE),
-            
-            # Service names (e.g., {"name":"APOLLO_SERVER"})
-            'service_name_json': re.compile(r'["\']name["\']\s*:\s*["\']([A-Z_]+)["\']', re.IGNORECASE),
-            'service_name_env': re.compile(r'SERVICE_NAME[=\s]+([A-Z_-]+)', re.IGNORECASE),
-            'service_name_log': re.compile(r'(?:Service|App|Application):\s*([A-Z_-]+)', re.IGNORECASE),
-            
-            # CI/CD Environment Variables
-            'github_repo_env': re.compile(r'GITHUB_REPOSITORY[=\s]+([a-zA-Z0-9_-]+)/([a-zA-Z0-9_.-]+)', re.IGNORECASE),
-            'gitlab_project': re.compile(r'CI_PROJECT_PATH[=\s]+([a-zA-Z0-9_-]+)/([a-zA-Z0-9_.-]+)', re.IGNORECASE),
-            'gitlab_url': re.compile(r'CI_PROJECT_URL[=\s]+https?://gitlab\.com/([a-zA-Z0-9_-]+)/([a-zA-Z0-9_.-]+)', re.IGNORECASE),
-            'circle_ci': re.compile(r'CIRCLE_PROJECT_USERNAME[=\s]+([a-zA-Z0-9_-]+).*?CIRCLE_PROJECT_REPONAME[=\s]+([a-zA-Z0-9_.-]+)', re.IGNORECASE | re.DOTALL),
-            'travis_ci': re.compile(r'TRAVIS_REPO_SLUG[=\s]+([a-zA-Z0-9_-]+)/([a-zA-Z0-9_.-]+)', re.IGNORECASE),
-            
-            # Commit hashes
-            'commit_hash': re.compile(r'(?:commit|sha|revision)[:\s]+([a-f0-9]{7,40})', re.IGNORECASE),
-            
-            # Branch names
-            'branch': re.compile(r'(?:branch|ref)[:\s]+([\w/-]+)', re.IGNORECASE),
-            
-            # Docker images
-            'docker_image': re.compile(r'(?:image|pulling|built from)[:\s]+([a-zA-Z0-9_-]+)/([a-zA-Z0-9_.-]+):([a-zA-Z0-9_.-]+)', re.IGNORECASE),
-            
-            # Package names (Java, Python, etc.)
-            'java_package': re.compile(r'(?:com|org|io)\.([a-zA-Z0-9]+)\.([a-zA-Z0-9]+)', re.IGNORECASE)
-        }
-    
-    def detect_repository(self, log_content: str, filename: str = '') -> Dict:
+    # CI/CD variable (ci_env group name) -> (git service, detection method)
+    CI_ENV_VARS = {
+        'github_repo_env': ('github', 'github_env_var'),
+        'gitlab_project': ('gitlab', 'gitlab_env_var'),
+        'gitlab_url': ('gitlab', 'gitlab_env_var'),
+        'travis_ci': (None, 'travis_ci_env')
+    }
+    
+    # Block size for the single-pass service mention count
+    INFER_BLOCK_SIZE = 64 * 1024
+    
+    # Detection results kept per detector, keyed by a digest of the log
+    RESULT_CACHE_SIZE = 256
+    
+    def __init__(self) -> None:
+        self.patterns: Dict[str, re.Pattern] = _PATTERNS
+        self.patterns_b: Dict[str, re.Pattern] = _PATTERNS_B
+        
+        # Compiled once per process (the patterns are the same for every instance)
+        if hyperscan:
+            specs = tuple((p.pattern, p.flags) for p in self.patterns.values())
+            self._hs_db = _compile_prefilter(specs)
+            self._hs_db_b = _compile_prefilter(specs, utf8=False)
+        else:
+            self._hs_db = self._hs_db_b = None
+        
+        # Detection priority: (pattern, confidence, handler), highest first
+        self._priority: List[Tuple[str, str, Callable[[re.Match, DetectionResult, LogContent], Optional[str]]]] = [
+            # Direct URLs and CI/CD environment variables
+            ('https_url', 'very_high', self._handle_https_url),
+            ('ssh_url', 'very_high', self._handle_ssh_url),
+            ('ci_env', 'very_high', self._handle_ci_env),
+            ('circle_user', 'very_high', self._handle_circle_ci),
+            # Explicit repository references and Docker image tags
+            ('org_repo', 'high', self._handle_org_repo),
+            ('repo_name', 'high', self._handle_repo_name),
+            ('docker_image', 'high', self._handle_docker_image),
+            # Educated guesses
+            ('java_package', 'medium', self._handle_java_package),
+            ('service_name', 'low', self._handle_service_name),
+        ]
+        
+        self._result_cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    def _prefilter(self, log_content: LogContent) -> Optional[Set[str]]:
+        """
+        Names of the patterns that may match log_content, from one hyperscan pass
+        
+        Without hyperscan, falls back to the literal gates (_literal_gates).
+        """
+        if isinstance(log_content, str):
+            db = self._hs_db
+            data = log_content.encode('utf-8', 'surrogatepass') if db is not None else None
+        else:
+            db, data = self._hs_db_b, log_content
+        if db is None:
+            return self._literal_gates(log_content)
+        
+        scratches = getattr(_hs_local, 'scratches', None)
+        if scratches is None:
+            scratches = _hs_local.scratches = {}
+        scratch = scratches.get(id(db))
+        if scratch is None:
+            scratch = scratches[id(db)] = hyperscan.Scratch(db)
+        
+        names = list(self.patterns)
+        hits = set()
+        
+        def on_match(pattern_id: int, start: int, end: int, flags: int, context: Any) -> None:
+            hits.add(names[pattern_id])
+        
+        try:
+            db.scan(data, match_event_handler=on_match, scratch=scratch)
+        except Exception:
+            return self._literal_gates(log_content)
+        return hits
+    
+    def _literal_gates(self, log_content: LogContent) -> Set[str]:
+        """Names of the patterns whose required literals occur in log_content"""
+        # Patterns are case-insensitive, so fold the log once and test the
+        # literals with substring search, which is far faster than a regex scan
+        # that can't match. casefold (not lower) so e.g. U+017F still gates 's'
+        if isinstance(log_content, str):
+            folded, gates = log_content.casefold(), _LITERAL_GATES
+        else:
+            folded, gates = log_content[:].lower(), _LITERAL_GATES_B
+        return {name for name in self.patterns if any(g in folded for g in gates[name])}
+    
+    def _search(self, name: str, log_content: LogContent, hits: Optional[Set[str]]) -> Optional[re.Match]:
+        """self.patterns[name].search (patterns_b for bytes), skipped when the prefilter ruled it out"""
+        if hits is not None and name not in hits:
+            return None
+        patterns = self.patterns if isinstance(log_content, str) else self.patterns_b
+        return patterns[name].search(log_content)
+    
+    def detect_repository(self, log_content: str, filename: str = '') -> DetectionResult:
         """
         Detect Git repository from log content
         
@@ -68,152 +293,85 @@ class GitRepositoryDetector:
                 'detection_methods': List of methods that found matches
             }
         """
-        result = {
-            'repository': None,
-            'repository_url': None,
-            'git_service': None,
-            'commit_hash': None,
-            'branch': None,
-            'confidence': 'none',
-            'detection_methods': []
-        }
-        
-        # Priority 1: Direct URLs (highest confidence)
-        match = self.patterns['https_url'].search(log_content)
-        if match:
-            repo_path = match.group(1)  # Full path: mindtickle/migrated-call-ai/apollo-server
-            result['repository'] = repo_path
-            result['repository_url'] = match.group(0)
-            result['git_service'] = self._detect_service_from_url(match.group(0))
-            result['confidence'] = 'very_high'
-            result['detection_methods'].append('https_url')
-            
-            # Extract service name from path (last component)
-            path_parts = repo_path.split('/')
-            if len(path_parts) >= 2:
-                result['service_name'] = path_parts[-1]
-            
-            # Try to find commit and branch
-            self._detect_commit_and_branch(log_content, result)
-            return result
-        
-        match = self.patterns['ssh_url'].search(log_content)
-        if match:
-            repo_path = match.group(1)  # Full path
-            result['repository'] = repo_path
-            result['git_service'] = self._detect_service_from_url(match.group(0))
-            result['confidence'] = 'very_high'
-            result['detection_methods'].append('ssh_url')
-            
-            # Extract service name from path (last component)
-            path_parts = repo_path.split('/')
-            if len(path_parts) >= 2:
-                result['service_name'] = path_parts[-1]
-            
-            self._detect_commit_and_branch(log_content, result)
-            return result
-        
-        # Priority 2: CI/CD Environment Variables (very high confidence)
-        match = self.patterns['github_repo_env'].search(log_content)
-        if match:
-            org, repo = match.groups()
-            result['repository'] = f"{org}/{repo}"
-            result['git_service'] = 'github'
-            result['confidence'] = 'very_high'
-            result['detection_methods'].append('github_env_var')
-            
-            self._detect_commit_and_branch(log_content, result)
-            return result
-        
-        match = self.patterns['gitlab_project'].search(log_content)
-        if match:
-            org, repo = match.groups()
-            result['repository'] = f"{org}/{repo}"
-            result['git_service'] = 'gitlab'
-            result['confidence'] = 'very_high'
-            result['detection_methods'].append('gitlab_env_var')
-            
-            self._detect_commit_and_branch(log_content, result)
-            return result
-        
-        match = self.patterns['travis_ci'].search(log_content)
-        if match:
-            org, repo = match.groups()
-            result['repository'] = f"{org}/{repo}"
-            result['confidence'] = 'very_high'
-            result['detection_methods'].append('travis_ci_env')
-            
-            self._detect_commit_and_branch(log_content, result)
-            return result
-        
-        # Priority 3: Explicit repository references (high confidence)
-        match = self.patterns['org_repo'].search(log_content)
-        if match:
-            org, repo = match.groups()
-            result['repository'] = f"{org}/{repo}"
-            result['confidence'] = 'high'
-            result['detection_methods'].append('explicit_repo_ref')
-            result['git_service'] = self._infer_service_from_log(log_content)
-            
-            self._detect_commit_and_branch(log_content, result)
-            return result
-        
-        match = self.patterns['repo_name'].search(log_content)
-        if match:
-            org, repo = match.groups()
-            result['repository'] = f"{org}/{repo}"
-            result['confidence'] = 'high'
-            result['detection_methods'].append('repo_name_pattern')
-            result['git_service'] = self._infer_service_from_log(log_content)
-            
-            self._detect_commit_and_branch(log_content, result)
-            return result
-        
-        # Priority 4: Docker image tags (high confidence)
-        match = self.patterns['docker_image'].search(log_content)
-        if match:
-            org, repo, tag = match.groups()
-            result['repository'] = f"{org}/{repo}"
-            result['confidence'] = 'high'
-            result['detection_methods'].append('docker_image_tag')
-            
-            # Tag might be a commit hash
-            if re.match(r'[a-f0-9]{7,40}', tag):
-                result['commit_hash'] = tag
-            
-            self._detect_commit_and_branch(log_content, result)
-            return result
-        
-        # Priority 5: Package names (medium confidence - educated guess)
-        match = self.patterns['java_package'].search(log_content)
-        if match:
-            domain, org_or_app = match.groups()
-            # This is a guess based on Java package naming conventions
-            result['repository'] = f"{org_or_app}/{domain}"
-            result['confidence'] = 'medium'
-            result['detection_methods'].append('package_name_inference')
-            
-            self._detect_commit_and_branch(log_content, result)
-            return result
-        
-        # Priority 6: Service names (low-medium confidence)
-        service_name = self._detect_service_name(log_content)
-        if service_name:
-            # Generate repository name variants
-            variants = self._service_name_to_repo_variants(service_name)
-            
-            # Use the most common variant (lowercase with dashes)
-            result['repository'] = None  # Will be set by user or Git config
-            result['service_name'] = service_name
-            result['repository_suggestions'] = variants  # Suggest these to user
-            result['confidence'] = 'low'
-            result['detection_methods'].append('service_name_inference')
-            
-            self._detect_commit_and_branch(log_content, result)
-            return result
+        return self._detect_cached(log_content)
+    
+    def detect_repository_from_path(self, path: str) -> DetectionResult:
+        """
+        Detect Git repository from a log file on disk
+        
+        The file is memory-mapped and scanned as bytes, so it is never read
+        into (and decoded as) one large string; only captured values are
+        decoded. Same result format as detect_repository.
+        
+        Args:
+            path: Path to the log file
+        """
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return self.detect_repository('')
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as log_data:
+                return self._detect_cached(log_data)
+    
+    def _detect_cached(self, log_content: LogContent) -> DetectionResult:
+        """detect_repository for a str or bytes-like log, cached by digest"""
+        # The same upload is often inspected more than once (retries, several
+        # callers); the whole log is hashed since any line can change the result
+        data = log_content.encode('utf-8', 'surrogatepass') if isinstance(log_content, str) else log_content
+        key = hashlib.blake2b(data, digest_size=16).digest()
+        with self._cache_lock:
+            cached = self._result_cache.get(key)
+            if cached is not None:
+                self._result_cache.move_to_end(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
+        result = self._detect_uncached(log_content)
+        with self._cache_lock:
+            self._result_cache[key] = copy.deepcopy(result)
+            if len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+        return result
+    
+    def _detect_uncached(self, log_content: LogContent) -> DetectionResult:
+        """Head-first detection (see detect_repository)"""
+        if len(log_content) > HEAD_SCAN_BYTES:
+            # Cut at a line boundary so a URL or name isn't truncated mid-token
+            newline = '\n' if isinstance(log_content, str) else b'\n'
+            cut = log_content.rfind(newline, 0, HEAD_SCAN_BYTES) + 1
+            if cut:
+                result = self._detect(log_content[:cut], log_content)
+                if result['confidence'] in ('very_high', 'high'):
+                    return result
+        
+        return self._detect(log_content)
+    
+    def _detect(self, log_content: LogContent, full_content: Optional[LogContent] = None) -> DetectionResult:
+        """
+        Run the detection cascade over log_content (str, or bytes-like for files)
+        
+        When log_content is only the head of the log, full_content is the whole
+        log, searched for commit/branch info the head doesn't contain.
+        """
+        result = _EMPTY_RESULT.copy()
+        result['detection_methods'] = []
+        
+        # One pass to find which patterns can match at all
+        hits = self._prefilter(log_content)
+        
+        # First pattern in priority order that matches decides the repository
+        for name, confidence, handler in self._priority:
+            match = self._search(name, log_content, hits)
+            method = match and handler(match, result, log_content)
+            if method:
+                result['detection_methods'].append(method)
+                result['confidence'] = confidence
+                
+                # Try to find commit and branch
+                self._detect_commit_and_branch(log_content, result, hits, full_content)
+                return result
         
         # If nothing found, try to extract at least commit and branch
-        self._detect_commit_and_branch(log_content, result)
+        self._detect_commit_and_branch(log_content, result, hits, full_content)
         
         if result['commit_hash'] or result['branch']:
             result['confidence'] = 'low'
@@ -221,26 +379,81 @@ class GitRepositoryDetector:
         
         return result
     
-    def _detect_service_name(self, log_content: str) -> Optional[str]:
-        """Detect service name from log content"""
-        # Try JSON format: {"name":"APOLLO_SERVER"}
-        match = self.patterns['service_name_json'].search(log_content)
-        if match:
-            return match.group(1)
-        
-        # Try environment variable: SERVICE_NAME=APOLLO_SERVER
-        match = self.patterns['service_name_env'].search(log_content)
-        if match:
-            return match.group(1)
-        
-        # Try log format: Service: APOLLO_SERVER
-        match = self.patterns['service_name_log'].search(log_content)
-        if match:
-            return match.group(1)
-        
-        return None
+    # Match handlers for _priority: each fills result from its pattern's match
+    # and returns the detection method name, or None (leaving result as is)
+    # when the match alone isn't enough
     
-    def _detect_service_from_url(self, url: str) -> str:
+    def _handle_https_url(self, match: re.Match, result: DetectionResult, log_content: LogContent) -> str:
+        """Direct HTTPS URL (also kept as repository_url)"""
+        result['repository_url'] = _text(match.group(0))
+        self._handle_ssh_url(match, result, log_content)
+        return 'https_url'
+    
+    def _handle_ssh_url(self, match: re.Match, result: DetectionResult, log_content: LogContent) -> str:
+        """Direct SSH URL"""
+        repo_path = _text(match.group(1))  # Full path: mindtickle/migrated-call-ai/apollo-server
+        result['repository'] = repo_path
+        result['git_service'] = self._detect_service_from_url(_text(match.group(0)))
+        
+        # Extract service name from path (last component)
+        path_parts = repo_path.split('/')
+        if len(path_parts) >= 2:
+            result['service_name'] = path_parts[-1]
+        return 'ssh_url'
+    
+    def _handle_ci_env(self, match: re.Match, result: DetectionResult, log_content: LogContent) -> str:
+        """CI/CD environment variable (see CI_ENV_VARS)"""
+        git_service, method = self.CI_ENV_VARS[match.lastgroup]
+        result['repository'] = _text(match.group(match.lastgroup))
+        result['git_service'] = git_service
+        return method
+    
+    def _handle_circle_ci(self, match: re.Match, result: DetectionResult, log_content: LogContent) -> Optional[str]:
+        """CircleCI CIRCLE_PROJECT_USERNAME plus CIRCLE_PROJECT_REPONAME"""
+        repo_match = self._search('circle_repo', log_content, None)
+        if not repo_match:
+            return None
+        result['repository'] = f"{_text(match.group(1))}/{_text(repo_match.group(1))}"
+        return 'circle_ci_env'
+    
+    def _handle_org_repo(self, match: re.Match, result: DetectionResult, log_content: LogContent) -> str:
+        """Explicit 'org/repo' reference; service inferred from the log"""
+        result['repository'] = _text(match.group(1))
+        result['git_service'] = self._infer_service_from_log(log_content)
+        return 'explicit_repo_ref'
+    
+    def _handle_repo_name(self, match: re.Match, result: DetectionResult, log_content: LogContent) -> str:
+        """'org/repo' after a deploy/build verb"""
+        self._handle_org_repo(match, result, log_content)
+        return 'repo_name_pattern'
+    
+    def _handle_docker_image(self, match: re.Match, result: DetectionResult, log_content: LogContent) -> str:
+        """Docker image org/repo:tag"""
+        repo_name, tag = map(_text, match.groups())
+        result['repository'] = repo_name
+        
+        # Tag might be a commit hash
+        if _HEX_COMMIT_RE.fullmatch(tag):
+            result['commit_hash'] = tag
+        return 'docker_image_tag'
+    
+    def _handle_java_package(self, match: re.Match, result: DetectionResult, log_content: LogContent) -> str:
+        """Package name (educated guess based on Java package naming conventions)"""
+        domain, org_or_app = map(_text, match.groups())
+        result['repository'] = f"{org_or_app}/{domain}"
+        return 'package_name_inference'
+    
+    def _handle_service_name(self, match: re.Match, result: DetectionResult, log_content: LogContent) -> str:
+        """Service name: no repository, only name variants to suggest to the user"""
+        # JSON format {"name":"APOLLO_SERVER"}, environment variable
+        # SERVICE_NAME=APOLLO_SERVER or log format Service: APOLLO_SERVER
+        service_name = _text(match.group(match.lastgroup))
+        result['repository'] = None  # Will be set by user or Git config
+        result['service_name'] = service_name
+        result['repository_suggestions'] = self._service_name_to_repo_variants(service_name)
+        return 'service_name_inference'
+    
+    def _detect_service_from_url(self, url: str) -> Optional[str]:
         """Detect Git service from URL"""
         url_lower = url.lower()
         if 'github.com' in url_lower:
@@ -251,14 +464,21 @@ class GitRepositoryDetector:
             return 'bitbucket'
         return None
     
-    def _infer_service_from_log(self, log_content: str) -> Optional[str]:
+    def _infer_service_from_log(self, log_content: LogContent) -> Optional[str]:
         """Infer Git service from log context"""
-        log_lower = log_content.lower()
-        
-        # Count mentions of each service
-        github_count = log_lower.count('github')
-        gitlab_count = log_lower.count('gitlab')
-        bitbucket_count = log_lower.count('bitbucket')
+        # Count mentions of each service in one sweep over the log: each
+        # cache-sized block is lowercased once and counted while it's hot,
+        # instead of lowercasing the whole log and scanning it three times.
+        # Blocks overlap by len(needle) - 1 and only occurrences starting
+        # inside the block are counted, so none is missed or counted twice
+        github, gitlab, bitbucket = _SERVICE_NEEDLES[not isinstance(log_content, str)]
+        github_count = gitlab_count = bitbucket_count = 0
+        block = self.INFER_BLOCK_SIZE
+        for start in range(0, len(log_content), block):
+            chunk = log_content[start:start + block + 8].lower()
+            github_count += chunk.count(github, 0, block + 5)
+            gitlab_count += chunk.count(gitlab, 0, block + 5)
+            bitbucket_count += chunk.count(bitbucket, 0, block + 8)
         
         if github_count > gitlab_count and github_count > bitbucket_count:
             return 'github'
@@ -269,21 +489,24 @@ class GitRepositoryDetector:
         
         return None
     
-    def _detect_commit_and_branch(self, log_content: str, result: Dict):
-        """Detect commit hash and branch name"""
-        # Find commit hash
-        commit_match = self.patterns['commit_hash'].search(log_content)
+    def _detect_commit_and_branch(self, log_content: LogContent, result: DetectionResult,
+                                  hits: Optional[Set[str]] = None,
+                                  full_content: Optional[LogContent] = None) -> None:
+        """Detect commit hash and branch name (falling back to full_content if given)"""
+        commit_match = self._search('commit_hash', log_content, hits)
+        branch_match = self._search('branch', log_content, hits)
+        if full_content is not None and not (commit_match and branch_match):
+            full_hits = self._prefilter(full_content)
+            commit_match = commit_match or self._search('commit_hash', full_content, full_hits)
+            branch_match = branch_match or self._search('branch', full_content, full_hits)
+        
+        # Found commit hash
         if commit_match:
-            result['commit_hash'] = commit_match.group(1)
+            result['commit_hash'] = _text(commit_match.group(1))
         
-        # Find branch name
-        branch_match = self.patterns['branch'].search(log_content)
+        # Found branch name
         if branch_match:
-            branch = branch_match.group(1)
-            # Clean up branch name (remove refs/heads/ prefix)
-            if branch.startswith('refs/heads/'):
-                branch = branch.replace('refs/heads/', '')
-            result['branch'] = branch
+            result['branch'] = _text(branch_match.group(1))
     
     def _service_name_to_repo_variants(self, service_name: str) -> List[str]:
         """
@@ -294,84 +517,73 @@ class GitRepositoryDetector:
         if not service_name:
             return []
         
-        variants = set()
-        
-        # Original
-        variants.add(service_name)
-        
-        # Lowercase with dashes
-        variants.add(service_name.lower().replace('_', '-'))
-        
-        # Lowercase with underscores
-        variants.add(service_name.lower())
-        
-        # Uppercase with dashes
-        variants.add(service_name.upper().replace('_', '-'))
+        # Original, lowercase with dashes, lowercase with underscores, uppercase with dashes
+        # (lower is a variant itself, so its dashed form is one translate of it)
+        lower = service_name.lower()
+        if service_name.isascii():
+            upper_dash = service_name.translate(_UPPER_DASH)
+        else:
+            upper_dash = service_name.upper().translate(_UNDERSCORE_TO_DASH)
+        variants = [
+            service_name,
+            lower.translate(_UNDERSCORE_TO_DASH),
+            lower,
+            upper_dash
+        ]
         
         # Just the first part (before underscore)
         if '_' in service_name:
-            first_part = service_name.split('_')[0]
-            variants.add(first_part.lower())
-            variants.add(first_part.upper())
+            first_part = service_name.partition('_')[0]
+            variants += (first_part.lower(), first_part.upper())
         
-        # Remove common suffixes
-        for suffix in ['_SERVER', '_SERVICE', '_API', '_APP', '-SERVER', '-SERVICE', '-API', '-APP']:
-            if service_name.upper().endswith(suffix):
-                base = service_name[:-len(suffix)]
-                variants.add(base.lower())
-                variants.add(base.lower().replace('_', '-'))
+        # Remove a common suffix
+        suffix = _SERVICE_SUFFIX_RE.search(lower)
+        if suffix:
+            base = lower[:suffix.start()]
+            variants += (base, base.translate(_UNDERSCORE_TO_DASH))
         
-        return list(variants)
+        # Deduplicate, keeping the order above
+        return list(dict.fromkeys(variants))
     
-    def detect_multiple_repositories(self, log_content: str) -> List[Dict]:
+    def detect_multiple_repositories(self, log_content: str) -> List[DetectionResult]:
         """
         Detect multiple repositories in log (for microservices)
         
         Returns:
             List of repository detection results
         """
+        # One scan for clone URLs and Docker images together, first
+        # occurrence of each repository per kind
+        found: Dict[str, Dict[str, re.Match]] = {kind: {} for kind in _MULTI_REPO_KINDS}
+        for match in _MULTI_REPO_RE.finditer(log_content):
+            # Each pattern's first group is the repository path
+            found[match.lastgroup].setdefault(match.group(match.lastindex + 1), match)
+        
+        # URLs before Docker images, a repository listed once (by its best source)
         repositories = []
         seen_repos = set()
-        
-        # Find all HTTPS URLs
-        for match in self.patterns['https_url'].finditer(log_content):
-            org, repo = match.groups()
-            repo_name = f"{org}/{repo}"
-            if repo_name not in seen_repos:
+        for kind, confidence in _MULTI_REPO_KINDS.items():
+            for repo_name, match in found[kind].items():
+                if repo_name in seen_repos:
+                    continue
                 seen_repos.add(repo_name)
-                repositories.append({
-                    'repository': repo_name,
-                    'repository_url': match.group(0),
-                    'git_service': self._detect_service_from_url(match.group(0)),
-                    'confidence': 'very_high'
-                })
-        
-        # Find all SSH URLs
-        for match in self.patterns['ssh_url'].finditer(log_content):
-            org, repo = match.groups()
-            repo_name = f"{org}/{repo}"
-            if repo_name not in seen_repos:
-                seen_repos.add(repo_name)
-                repositories.append({
-                    'repository': repo_name,
-                    'git_service': self._detect_service_from_url(match.group(0)),
-                    'confidence': 'very_high'
-                })
-        
-        # Find all Docker images
-        for match in self.patterns['docker_image'].finditer(log_content):
-            org, repo, tag = match.groups()
-            repo_name = f"{org}/{repo}"
-            if repo_name not in seen_repos:
-                seen_repos.add(repo_name)
-                repositories.append({
-                    'repository': repo_name,
-                    'confidence': 'high'
-                })
+                
+                entry = {'repository': repo_name}
+                if kind == 'https_url':
+                    entry['repository_url'] = match.group(kind)
+                if kind != 'docker_image':
+                    entry['git_service'] = self._detect_service_from_url(match.group(kind))
+                entry['confidence'] = confidence
+                repositories.append(entry)
         
         return repositories if repositories else [self.detect_repository(log_content)]
 
 
+# Shared detector: patterns and prefilter are module-level, and sharing it
+# lets its result cache serve repeated requests for the same log
+default_detector = GitRepositoryDetector()
+
+
 # Example usage
 if __name__ == "__main__":
     # Test detection
@@ -383,8 +595,7 @@ if __name__ == "__main__":
     [ERROR] NullPointerException in UserService
     """
     
-    detector = GitRepositoryDetector()
-    result = detector.detect_repository(test_log)
+    result = default_detector.detect_repository(test_log)
     
     print("Detection result:")
     print(f"  Repository: {result['repository']}")
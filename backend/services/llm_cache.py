@@ -0,0 +1,112 @@
+"""
+LLM Response Cache - On-disk LRU cache for near-deterministic LLM calls
+
+Responses are keyed on a SHA-256 of (provider, model, system prompt, prompt),
+so re-running the same request (dev reruns, re-uploads of the same log)
+skips the API round-trip. Only use it for low-temperature calls (<= 0.3):
+a cached answer to a "creative" prompt would make regeneration a no-op.
+
+From async code use aget()/aset(), which run the SQLite work (reads,
+writes, commits) in a worker thread instead of on the event loop.
+"""
+
+import os
+import json
+import asyncio
+import time
+import hashlib
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+DEFAULT_CACHE_PATH = Path(os.environ.get('LLM_CACHE_PATH', '~/.chaturlog/llm_cache/cache.db')).expanduser()
+
+
+class LLMCache:
+    """SQLite-backed LRU cache of LLM responses"""
+    
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, max_entries: int = 5000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        
+        # key -> last hit time, written with the next set() so a cache hit
+        # costs a single indexed read and no commit
+        self._touched: Dict[str, float] = {}
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used)')
+        self.conn.commit()
+    
+    @staticmethod
+    def make_key(provider: str, model: str, system_prompt: str, prompt: str) -> str:
+        """Cache key covering everything that determines the response"""
+        payload = json.dumps({"p": provider, "m": model, "s": system_prompt, "u": prompt}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key (marking it recently used), or None"""
+        # Best effort: a cache problem must never fail the LLM call itself
+        try:
+            with self._lock:
+                row = self.conn.execute('SELECT response FROM llm_cache WHERE key = ?', (key,)).fetchone()
+                if row is None:
+                    return None
+                self._touched[key] = time.time()
+                return row[0]
+        except sqlite3.Error as e:
+            print(f"⚠️ LLM cache read failed: {e}")
+            return None
+    
+    def set(self, key: str, response: str) -> None:
+        """Store a response, evicting the least recently used entries past max_entries"""
+        try:
+            with self._lock:
+                # Record pending hits first so eviction sees up-to-date recency
+                if self._touched:
+                    self.conn.executemany(
+                        'UPDATE llm_cache SET last_used = ? WHERE key = ?',
+                        [(used, touched) for touched, used in self._touched.items()]
+                    )
+                    self._touched.clear()
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO llm_cache (key, response, last_used) VALUES (?, ?, ?)',
+                    (key, response, time.time())
+                )
+                self.conn.execute('''
+                    DELETE FROM llm_cache WHERE key IN (
+                        SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                    )
+                ''', (self.max_entries,))
+                self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ LLM cache write failed: {e}")
+    
+    async def aget(self, key: str) -> Optional[str]:
+        """get() in a worker thread"""
+        return await asyncio.to_thread(self.get, key)
+    
+    async def aset(self, key: str, response: str) -> None:
+        """set() in a worker thread"""
+        await asyncio.to_thread(self.set, key, response)
+
+
+@lru_cache(maxsize=None)
+def get_llm_cache() -> Optional[LLMCache]:
+    """Shared cache instance, or None if the cache location isn't usable"""
+    try:
+        return LLMCache()
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️ LLM response cache disabled: {e}")
+        return None
@@ -11,13 +11,58 @@ This service processes large log files by:
 Handles logs of ANY size without token limits!
 """
 
+import os
+import asyncio
 import re
 import json
+import sqlite3
 import hashlib
-from typing import List, Dict, Any, Iterator, Optional
+from dataclasses import dataclass
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
+from services.llm_cache import get_llm_cache
+
+try:
+    import xxhash
+    _xxh3_hexdigest = xxhash.xxh3_64_hexdigest
+except ImportError:  # optional non-cryptographic hash (MD5 otherwise)
+    _xxh3_hexdigest = None
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:  # optional C-accelerated parser/serializer
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+
+@dataclass(slots=True)
+class Chunk:
+    """A chunk of a log file as yielded by the LogChunker methods"""
+    chunk_id: int
+    content: Optional[str]  # None for stat_only chunks
+    start_line: int
+    end_line: int
+    size: int
+    timestamp_range: Tuple[Optional[datetime], Optional[datetime]]
+    hash: Optional[str]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'chunk_id': self.chunk_id,
+            'content': self.content,
+            'start_line': self.start_line,
+            'end_line': self.end_line,
+            'size': self.size,
+            'timestamp_range': self.timestamp_range,
+            'hash': self.hash
+        }
+
 
 class LogChunker:
     """
@@ -30,78 +75,106 @@ class LogChunker:
     - Incremental processing (resume from last chunk)
     """
     
+    # Block size for stream_chunks reads (fewer, larger sequential reads)
+    READ_BUFFER_SIZE = 1 << 20
+    
+    # Default section delimiter for smart_chunk_by_pattern, compiled once
+    DEFAULT_DELIMITER = r'^={3,}|^-{3,}'
+    _DEFAULT_DELIMITER_RE = re.compile(DEFAULT_DELIMITER)
+    
+    # Timestamp formats fused into one scan; the named group that matched
+    # says where the date fields are (both are fixed width, time at 11-19)
+    _TIMESTAMP_RE = re.compile(
+        r'(?P<iso>\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2})'
+        r'|(?P<us>\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2})'
+    )
+    
     def __init__(self, chunk_size: int = 5000):
         """
         Args:
             chunk_size: Characters per chunk (~1.25k tokens, safer for AI context limits)
         """
         self.chunk_size = chunk_size
-        self.timestamp_patterns = [
-            r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}',
-            r'\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2}',
-            r'\[.*?\d{4}.*?\]',
-        ]
     
-    def stream_chunks(self, file_path: str) -> Iterator[Dict[str, Any]]:
+    def stream_chunks(self, file_path: str, stat_only: bool = False, *,
+                      compute_time_range: bool = True, compute_hash: bool = True) -> Iterator[Chunk]:
         """
         Stream log file in chunks (memory efficient)
         
+        Args:
+            stat_only: Only fill in chunk_id, start_line, end_line and size
+                (content and hash are None, timestamp_range is (None, None))
+            compute_time_range: If False, timestamp_range is (None, None)
+            compute_hash: If False, hash is None
+        
         Yields:
-            {
-                'chunk_id': int,
-                'content': str,
-                'start_line': int,
-                'end_line': int,
-                'size': int,
-                'timestamp_range': (start, end),
-                'hash': str
-            }
+            Chunk (see Chunk.to_dict() for the dict form)
         """
         chunk_id = 0
-        buffer = []
-        buffer_size = 0
         line_number = 0
         start_line = 0
         
+        if stat_only:
+            build = self._build_stat_chunk
+        else:
+            # None means "extract it from the content"
+            timestamp_range = None if compute_time_range else (None, None)
+            
+            def build(chunk_id, content, start_line, end_line):
+                return self._make_chunk(chunk_id, content, start_line, end_line,
+                                        timestamp_range, compute_hash)
+        
+        # The file is read in large text-mode blocks (decoded, with universal
+        # newlines, so sizes and line numbers count characters and lines exactly
+        # like iterating the file) and chunk boundaries are found with
+        # find/count on the block (C loops) instead of iterating line by line:
+        # a chunk ends with the first newline at or past chunk_size characters
+        min_end = max(self.chunk_size, 1) - 1
+        pending = ''
+        scanned = 0  # no newline at or past a chunk's min_end before this
         with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-            for line in f:
-                line_number += 1
-                buffer.append(line)
-                buffer_size += len(line)
+            self._advise_sequential(f)
+            while True:
+                block = f.read(self.READ_BUFFER_SIZE)
+                pending += block
                 
-                # Yield chunk when size limit reached
-                if buffer_size >= self.chunk_size:
-                    content = ''.join(buffer)
-                    
-                    yield {
-                        'chunk_id': chunk_id,
-                        'content': content,
-                        'start_line': start_line,
-                        'end_line': line_number,
-                        'size': buffer_size,
-                        'timestamp_range': self._extract_time_range(content),
-                        'hash': self._hash_content(content)
-                    }
+                pos = 0
+                while True:
+                    end = pending.find('\n', max(pos + min_end, scanned))
+                    if end < 0:
+                        break
+                    end += 1
+                    line_number += pending.count('\n', pos, end)
+                    yield build(chunk_id, pending[pos:end], start_line, line_number)
                     
                     chunk_id += 1
-                    buffer = []
-                    buffer_size = 0
                     start_line = line_number
-            
-            # Yield remaining content
-            if buffer:
-                content = ''.join(buffer)
-                yield {
-                    'chunk_id': chunk_id,
-                    'content': content,
-                    'start_line': start_line,
-                    'end_line': line_number,
-                    'size': buffer_size,
-                    'timestamp_range': self._extract_time_range(content),
-                    'hash': self._hash_content(content)
-                }
-    
-    def smart_chunk_by_time(self, file_path: str, time_window_seconds: int = 300) -> Iterator[Dict[str, Any]]:
+                    pos = end
+                
+                # Keep the unfinished chunk; a long line isn't rescanned
+                pending = pending[pos:]
+                scanned = len(pending)
+                if not block:
+                    break
+        
+        # Yield remaining content (the last line may lack a newline)
+        if pending:
+            line_number += pending.count('\n') + (not pending.endswith('\n'))
+            yield build(chunk_id, pending, start_line, line_number)
+    
+    def _make_chunk(self, chunk_id: int, content: str, start_line: int, end_line: int,
+                    timestamp_range: Optional[tuple] = None, compute_hash: bool = True) -> Chunk:
+        """Build a Chunk for content (timestamp_range is extracted unless given)"""
+        if timestamp_range is None:
+            timestamp_range = self._extract_time_range(content)
+        return Chunk(chunk_id, content, start_line, end_line, len(content), timestamp_range,
+                     self._hash_content(content) if compute_hash else None)
+    
+    def _build_stat_chunk(self, chunk_id: int, content: str, start_line: int, end_line: int) -> Chunk:
+        """Build a stat_only Chunk (no content, time range or hash)"""
+        return Chunk(chunk_id, None, start_line, end_line, len(content), (None, None), None)
+    
+    def smart_chunk_by_time(self, file_path: str, time_window_seconds: int = 300) -> Iterator[Chunk]:
         """
         Chunk logs by time windows (e.g., every 5 minutes)
         
@@ -114,6 +187,7 @@ class LogChunker:
         start_line = 0
         
         with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            self._advise_sequential(f)
             for line in f:
                 line_number += 1
                 timestamp = self._extract_timestamp(line)
@@ -127,16 +201,8 @@ class LogChunker:
                     
                     if time_diff > time_window_seconds and current_chunk:
                         # Yield current chunk
-                        content = ''.join(current_chunk)
-                        yield {
-                            'chunk_id': chunk_id,
-                            'content': content,
-                            'start_line': start_line,
-                            'end_line': line_number - 1,
-                            'size': len(content),
-                            'timestamp_range': (current_chunk_start_time, timestamp),
-                            'hash': self._hash_content(content)
-                        }
+                        yield self._make_chunk(chunk_id, ''.join(current_chunk), start_line, line_number - 1,
+                                               (current_chunk_start_time, timestamp))
                         
                         chunk_id += 1
                         current_chunk = []
@@ -147,18 +213,10 @@ class LogChunker:
             
             # Yield remaining
             if current_chunk:
-                content = ''.join(current_chunk)
-                yield {
-                    'chunk_id': chunk_id,
-                    'content': content,
-                    'start_line': start_line,
-                    'end_line': line_number,
-                    'size': len(content),
-                    'timestamp_range': (current_chunk_start_time, None),
-                    'hash': self._hash_content(content)
-                }
-    
-    def smart_chunk_by_pattern(self, file_path: str, pattern: str = r'^={3,}|^-{3,}') -> Iterator[Dict[str, Any]]:
+                yield self._make_chunk(chunk_id, ''.join(current_chunk), start_line, line_number,
+                                       (current_chunk_start_time, None))
+    
+    def smart_chunk_by_pattern(self, file_path: str, pattern: str = DEFAULT_DELIMITER) -> Iterator[Chunk]:
         """
         Chunk logs by delimiter patterns (e.g., ===, ---, section headers)
         
@@ -168,25 +226,17 @@ class LogChunker:
         chunk_id = 0
         line_number = 0
         start_line = 0
-        delimiter_pattern = re.compile(pattern)
+        delimiter_pattern = self._DEFAULT_DELIMITER_RE if pattern == self.DEFAULT_DELIMITER else re.compile(pattern)
         
         with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            self._advise_sequential(f)
             for line in f:
                 line_number += 1
                 
                 # Check if this is a delimiter
                 if delimiter_pattern.match(line) and current_chunk:
                     # Yield current chunk
-                    content = ''.join(current_chunk)
-                    yield {
-                        'chunk_id': chunk_id,
-                        'content': content,
-                        'start_line': start_line,
-                        'end_line': line_number - 1,
-                        'size': len(content),
-                        'timestamp_range': self._extract_time_range(content),
-                        'hash': self._hash_content(content)
-                    }
+                    yield self._make_chunk(chunk_id, ''.join(current_chunk), start_line, line_number - 1)
                     
                     chunk_id += 1
                     current_chunk = []
@@ -196,70 +246,94 @@ class LogChunker:
             
             # Yield remaining
             if current_chunk:
-                content = ''.join(current_chunk)
-                yield {
-                    'chunk_id': chunk_id,
-                    'content': content,
-                    'start_line': start_line,
-                    'end_line': line_number,
-                    'size': len(content),
-                    'timestamp_range': self._extract_time_range(content),
-                    'hash': self._hash_content(content)
-                }
+                yield self._make_chunk(chunk_id, ''.join(current_chunk), start_line, line_number)
     
     def get_chunk_statistics(self, file_path: str) -> Dict[str, Any]:
         """Get statistics about how a file would be chunked"""
-        chunks = list(self.stream_chunks(file_path))
+        # Running totals over a stat-only stream; no chunk is kept
+        total_chunks = 0
+        total_size = 0
+        min_size = 0
+        max_size = 0
+        
+        for chunk in self.stream_chunks(file_path, stat_only=True):
+            size = chunk.size
+            if not total_chunks or size < min_size:
+                min_size = size
+            if size > max_size:
+                max_size = size
+            total_chunks += 1
+            total_size += size
         
         return {
-            'total_chunks': len(chunks),
-            'total_size': sum(c['size'] for c in chunks),
-            'avg_chunk_size': sum(c['size'] for c in chunks) / len(chunks) if chunks else 0,
-            'min_chunk_size': min(c['size'] for c in chunks) if chunks else 0,
-            'max_chunk_size': max(c['size'] for c in chunks) if chunks else 0,
-            'estimated_tokens': sum(c['size'] for c in chunks) // 4,  # ~4 chars per token
-            'estimated_cost_usd': (sum(c['size'] for c in chunks) // 4) * 0.000005,  # Rough estimate
+            'total_chunks': total_chunks,
+            'total_size': total_size,
+            'avg_chunk_size': total_size / total_chunks if total_chunks else 0,
+            'min_chunk_size': min_size,
+            'max_chunk_size': max_size,
+            'estimated_tokens': total_size // 4,  # ~4 chars per token
+            'estimated_cost_usd': (total_size // 4) * 0.000005,  # Rough estimate
         }
     
+    @staticmethod
+    def _advise_sequential(f) -> None:
+        """Tell the kernel the file is read front to back (larger readahead on Linux)"""
+        if hasattr(os, 'posix_fadvise'):
+            try:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+    
     def _extract_timestamp(self, line: str) -> Optional[datetime]:
-        """Extract timestamp from log line"""
-        for pattern in self.timestamp_patterns:
-            match = re.search(pattern, line)
-            if match:
-                try:
-                    # Try common formats
-                    timestamp_str = match.group()
-                    for fmt in ['%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%m/%d/%Y %H:%M:%S']:
-                        try:
-                            return datetime.strptime(timestamp_str[:19], fmt)
-                        except ValueError:
-                            continue
-                except Exception:
-                    pass
+        """Extract timestamp from log line (the first one that is a valid date)"""
+        match = self._TIMESTAMP_RE.search(line)
+        while match:
+            # Fields are sliced out directly (strptime re-parses its format
+            # string on every call); datetime() still rejects invalid dates
+            ts = match.group()
+            if match.lastgroup == 'iso':
+                year, month, day = ts[0:4], ts[5:7], ts[8:10]
+            else:
+                month, day, year = ts[0:2], ts[3:5], ts[6:10]
+            try:
+                return datetime(int(year), int(month), int(day), int(ts[11:13]), int(ts[14:16]), int(ts[17:19]))
+            except ValueError:
+                # e.g. month 13; keep looking further along the line
+                match = self._TIMESTAMP_RE.search(line, match.end())
         return None
     
     def _extract_time_range(self, content: str) -> tuple:
         """Extract start and end timestamps from content"""
-        lines = content.split('\n')
+        # Only the first and last 10 lines are looked at, so they're cut out
+        # with find/rfind instead of splitting the whole chunk into lines
         start_time = None
         end_time = None
         
         # Find first timestamp
-        for line in lines[:min(10, len(lines))]:
-            start_time = self._extract_timestamp(line)
-            if start_time:
+        pos = 0
+        for _ in range(10):
+            end = content.find('\n', pos)
+            start_time = self._extract_timestamp(content[pos:end] if end >= 0 else content[pos:])
+            if start_time or end < 0:
                 break
+            pos = end + 1
         
         # Find last timestamp
-        for line in reversed(lines[-min(10, len(lines)):]):
-            end_time = self._extract_timestamp(line)
-            if end_time:
+        end = len(content)
+        for _ in range(10):
+            pos = content.rfind('\n', 0, end) + 1
+            end_time = self._extract_timestamp(content[pos:end])
+            if end_time or pos == 0:
                 break
+            end = pos - 1
         
         return (start_time, end_time)
     
     def _hash_content(self, content: str) -> str:
         """Generate hash for chunk content (for deduplication)"""
+        # Dedup needs no cryptographic strength; xxh3 is far faster than MD5
+        if _xxh3_hexdigest is not None:
+            return _xxh3_hexdigest(content.encode())
         return hashlib.md5(content.encode()).hexdigest()[:16]
 
 
@@ -270,6 +344,30 @@ class ChunkSummarizer:
     Each chunk gets summarized independently, then summaries are aggregated
     """
     
+    _JSON_CODEBLOCK_RE = re.compile(r'```(?:json)?\n?(\{.*?\})\n?```', re.DOTALL)
+    _JSON_TOKEN_RE = re.compile(r'[{}"\\]')
+    
+    _SYSTEM_PROMPT = "You are a log analysis expert. Provide concise, structured summaries."
+    
+    # Summarization prompt; only the chunk fields are filled in per call
+    _PROMPT_TEMPLATE = """Analyze log chunk {chunk_id} (lines {start_line}-{end_line}):
+
+```
+{content}
+```
+
+Return JSON:
+{{
+  "summary": "Brief overview",
+  "errors_found": [{{"type": "error", "description": "what happened", "severity": "high/medium/low"}}],
+  "api_calls": [{{"method": "GET", "endpoint": "/path", "status": 200}}],
+  "performance_issues": [{{"issue": "slow query", "impact": "2s"}}],
+  "key_patterns": ["pattern"],
+  "severity": "critical/high/medium/low/info"
+}}
+
+Focus on errors, APIs, performance. Be concise."""
+    
     def __init__(self, ai_model: str = "gpt-4o-mini", api_key: str = None):
         """Use mini model for cost efficiency on large logs"""
         self.ai_model = ai_model
@@ -289,7 +387,7 @@ class ChunkSummarizer:
             self.provider = "openai"
             self.model_name = "gpt-4o-mini"
     
-    async def summarize_chunk(self, chunk: Dict[str, Any]) -> Dict[str, Any]:
+    async def summarize_chunk(self, chunk: Chunk) -> Dict[str, Any]:
         """
         Summarize a single chunk
         
@@ -305,55 +403,75 @@ class ChunkSummarizer:
                 'line_range': (int, int)
             }
         """
-        prompt = f"""Analyze log chunk {chunk['chunk_id']} (lines {chunk['start_line']}-{chunk['end_line']}):
-
-```
-{chunk['content'][:4000]}
-```
-
-Return JSON:
-{{
-  "summary": "Brief overview",
-  "errors_found": [{{"type": "error", "description": "what happened", "severity": "high/medium/low"}}],
-  "api_calls": [{{"method": "GET", "endpoint": "/path", "status": 200}}],
-  "performance_issues": [{{"issue": "slow query", "impact": "2s"}}],
-  "key_patterns": ["pattern"],
-  "severity": "critical/high/medium/low/info"
-}}
-
-Focus on errors, APIs, performance. Be concise."""
+        prompt = self._PROMPT_TEMPLATE.format(
+            chunk_id=chunk.chunk_id,
+            start_line=chunk.start_line,
+            end_line=chunk.end_line,
+            content=chunk.content[:4000]
+        )
+        
+        # Summaries run at temperature 0.3, so an identical request (same
+        # chunk, model and prompt) is answered from the response cache, kept
+        # off the event loop since its SQLite calls block (the first one opens it)
+        cache = await asyncio.to_thread(get_llm_cache)
+        cache_key = cache.make_key(self.provider, self.model_name, self._SYSTEM_PROMPT, prompt) if cache else None
         
         try:
-            if self.provider == "openai":
-                response = await self._call_openai(prompt)
-            elif self.provider == "anthropic":
-                response = await self._call_anthropic(prompt)
-            elif self.provider == "google":
-                response = await self._call_google(prompt)
-            else:
-                raise ValueError(f"Unsupported provider: {self.provider}")
+            response = await cache.aget(cache_key) if cache else None
+            cached = response is not None
+            if not cached:
+                response = await self._call_provider(prompt)
             
             # Parse response
             summary_data = json.loads(self._extract_json(response))
-            summary_data['chunk_id'] = chunk['chunk_id']
-            summary_data['line_range'] = (chunk['start_line'], chunk['end_line'])
-            summary_data['timestamp_range'] = chunk['timestamp_range']
+            
+            # Only responses that parsed are worth replaying
+            if cache and not cached:
+                await cache.aset(cache_key, response)
+            summary_data['chunk_id'] = chunk.chunk_id
+            summary_data['line_range'] = (chunk.start_line, chunk.end_line)
+            summary_data['timestamp_range'] = chunk.timestamp_range
             
             return summary_data
             
         except Exception as e:
             return {
-                'chunk_id': chunk['chunk_id'],
+                'chunk_id': chunk.chunk_id,
                 'summary': f"Error summarizing chunk: {str(e)}",
                 'errors_found': [],
                 'api_calls': [],
                 'performance_issues': [],
                 'key_patterns': [],
                 'severity': 'unknown',
-                'line_range': (chunk['start_line'], chunk['end_line']),
-                'timestamp_range': chunk.get('timestamp_range', (None, None))
+                'line_range': (chunk.start_line, chunk.end_line),
+                'timestamp_range': chunk.timestamp_range
             }
     
+    async def summarize_all(self, chunks: Iterable[Chunk], concurrency: int = 8) -> List[Dict[str, Any]]:
+        """
+        Summarize chunks concurrently, at most `concurrency` API calls in flight
+        
+        Summarization is network-bound, so this scales with the limit up to
+        the provider's rate limits. Results are returned in chunk order.
+        """
+        sem = asyncio.Semaphore(concurrency)
+        
+        async def run(chunk: Chunk) -> Dict[str, Any]:
+            async with sem:
+                return await self.summarize_chunk(chunk)
+        
+        return await asyncio.gather(*(run(chunk) for chunk in chunks))
+    
+    async def _call_provider(self, prompt: str) -> str:
+        """Call the configured provider's API"""
+        if self.provider == "openai":
+            return await self._call_openai(prompt)
+        elif self.provider == "anthropic":
+            return await self._call_anthropic(prompt)
+        elif self.provider == "google":
+            return await self._call_google(prompt)
+        raise ValueError(f"Unsupported provider: {self.provider}")
+    
     async def _call_openai(self, prompt: str) -> str:
         """Call OpenAI API"""
         import openai
@@ -362,7 +480,7 @@ Focus on errors, APIs, performance. Be concise."""
         response = await client.chat.completions.create(
             model=self.model_name,
             messages=[
-                {"role": "system", "content": "You are a log analysis expert. Provide concise, structured summaries."},
+                {"role": "system", "content": self._SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.3,
@@ -380,7 +498,7 @@ Focus on errors, APIs, performance. Be concise."""
             model=self.model_name,
             max_tokens=1000,
             temperature=0.3,
-            system="You are a log analysis expert. Provide concise, structured summaries.",
+            system=self._SYSTEM_PROMPT,
             messages=[{"role": "user", "content": prompt}]
         )
         
@@ -393,7 +511,7 @@ Focus on errors, APIs, performance. Be concise."""
         genai.configure(api_key=self.api_key)
         model = genai.GenerativeModel(
             model_name=self.model_name,
-            system_instruction="You are a log analysis expert. Provide concise, structured summaries."
+            system_instruction=self._SYSTEM_PROMPT
         )
         
         generation_config = genai.GenerationConfig(
@@ -407,16 +525,49 @@ Focus on errors, APIs, performance. Be concise."""
     def _extract_json(self, text: str) -> str:
         """Extract JSON from markdown or plain text"""
         # Try to find JSON in code blocks
-        json_match = re.search(r'```(?:json)?\n?(\{.*?\})\n?```', text, re.DOTALL)
+        json_match = self._JSON_CODEBLOCK_RE.search(text)
         if json_match:
             return json_match.group(1)
         
-        # Try to find raw JSON
-        json_match = re.search(r'(\{.*\})', text, re.DOTALL)
-        if json_match:
-            return json_match.group(1)
+        # Try to find raw JSON: first '{' up to its matching '}'
+        start = text.find('{')
+        if start != -1:
+            end = self._match_brace(text, start)
+            if end == -1:
+                # Unbalanced (e.g. truncated): span to the last '}'
+                end = text.rfind('}') + 1
+            if end > start:
+                return text[start:end]
         
         return text
+    
+    @classmethod
+    def _match_brace(cls, text: str, start: int) -> int:
+        """Return the index past the '}' closing text[start], or -1 (string-aware)"""
+        depth = 0
+        in_string = False
+        skip_to = -1
+        
+        for match in cls._JSON_TOKEN_RE.finditer(text, start):
+            pos = match.start()
+            if pos < skip_to:
+                continue
+            char = text[pos]
+            if in_string:
+                if char == '\\':
+                    skip_to = pos + 2
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    return pos + 1
+        
+        return -1
 
 
 class ChunkIndex:
@@ -426,6 +577,17 @@ class ChunkIndex:
     Enables quick querying of relevant chunks for test generation
     """
     
+    # Severity -> rank stored alongside it (unknown severities rank 0)
+    SEVERITY_RANKS = {'critical': 4, 'high': 3, 'medium': 2, 'low': 1, 'info': 0}
+    
+    _INSERT_SQL = '''
+        INSERT INTO chunk_summaries (
+            analysis_id, chunk_id, summary, errors_json, api_calls_json,
+            performance_issues_json, key_patterns_json, severity, severity_rank,
+            start_line, end_line, timestamp_start, timestamp_end
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
     def __init__(self, db_connection):
         """Initialize with database connection"""
         self.conn = db_connection
@@ -434,6 +596,19 @@ class ChunkIndex:
     def _ensure_table(self):
         """Create chunk_summaries table if not exists"""
         cursor = self.conn.cursor()
+        
+        # WAL with synchronous=NORMAL: no fsync per commit, still crash-safe.
+        # journal_mode can't change inside an open transaction; that's fine,
+        # the defaults just stay
+        try:
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
+        except sqlite3.OperationalError:
+            pass
+        # 64 MB page cache (negative = KiB) and in-memory temp tables for
+        # sorting; both are per connection and can be set at any time
+        cursor.execute('PRAGMA cache_size=-65536')
+        cursor.execute('PRAGMA temp_store=MEMORY')
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS chunk_summaries (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -445,6 +620,7 @@ class ChunkIndex:
                 performance_issues_json TEXT,
                 key_patterns_json TEXT,
                 severity TEXT,
+                severity_rank INTEGER NOT NULL DEFAULT 0,
                 start_line INTEGER,
                 end_line INTEGER,
                 timestamp_start TEXT,
@@ -460,53 +636,65 @@ class ChunkIndex:
             ON chunk_summaries(analysis_id, severity)
         ''')
         
+        # Tables created before severity_rank existed: add and backfill it
+        try:
+            cursor.execute("SELECT severity_rank FROM chunk_summaries LIMIT 1")
+        except sqlite3.OperationalError:
+            cursor.execute("ALTER TABLE chunk_summaries ADD COLUMN severity_rank INTEGER NOT NULL DEFAULT 0")
+            cases = ' '.join(f"WHEN '{severity}' THEN {rank}" for severity, rank in self.SEVERITY_RANKS.items())
+            cursor.execute(f"UPDATE chunk_summaries SET severity_rank = CASE severity {cases} ELSE 0 END")
+        
+        # Severity filtering and ordering happen in SQL on this index
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_chunk_summaries_rank
+            ON chunk_summaries(analysis_id, severity_rank)
+        ''')
+        
         self.conn.commit()
     
     def store_chunk_summary(self, analysis_id: int, summary: Dict[str, Any]):
         """Store a chunk summary"""
         cursor = self.conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO chunk_summaries (
-                analysis_id, chunk_id, summary, errors_json, api_calls_json,
-                performance_issues_json, key_patterns_json, severity,
-                start_line, end_line, timestamp_start, timestamp_end
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        cursor.execute(self._INSERT_SQL, self._summary_row(analysis_id, summary))
+        self.conn.commit()
+    
+    def store_chunk_summaries_bulk(self, analysis_id: int, summaries: List[Dict[str, Any]]):
+        """Store many chunk summaries in one transaction (one commit instead of one per chunk)"""
+        cursor = self.conn.cursor()
+        cursor.executemany(self._INSERT_SQL, [self._summary_row(analysis_id, summary) for summary in summaries])
+        self.conn.commit()
+    
+    @staticmethod
+    def _summary_row(analysis_id: int, summary: Dict[str, Any]) -> tuple:
+        """Column values of a chunk_summaries row, in _INSERT_SQL order"""
+        return (
             analysis_id,
             summary['chunk_id'],
             summary.get('summary', ''),
-            json.dumps(summary.get('errors_found', [])),
-            json.dumps(summary.get('api_calls', [])),
-            json.dumps(summary.get('performance_issues', [])),
-            json.dumps(summary.get('key_patterns', [])),
+            _json_dumps(summary.get('errors_found', [])),
+            _json_dumps(summary.get('api_calls', [])),
+            _json_dumps(summary.get('performance_issues', [])),
+            _json_dumps(summary.get('key_patterns', [])),
             summary.get('severity', 'info'),
+            ChunkIndex.SEVERITY_RANKS.get(summary.get('severity', 'info'), 0),
             summary['line_range'][0],
             summary['line_range'][1],
             str(summary['timestamp_range'][0]) if summary['timestamp_range'][0] else None,
             str(summary['timestamp_range'][1]) if summary['timestamp_range'][1] else None
-        ))
-        
-        self.conn.commit()
+        )
     
     def get_summaries_by_severity(self, analysis_id: int, min_severity: str = 'medium') -> List[Dict]:
-        """Get chunk summaries filtered by severity"""
-        severity_levels = {'critical': 4, 'high': 3, 'medium': 2, 'low': 1, 'info': 0}
-        min_level = severity_levels.get(min_severity, 2)
+        """Get chunk summaries filtered by severity (most severe first)"""
+        min_level = self.SEVERITY_RANKS.get(min_severity, 2)
         
         cursor = self.conn.cursor()
         cursor.execute('''
             SELECT * FROM chunk_summaries 
-            WHERE analysis_id = ?
-            ORDER BY severity DESC, chunk_id ASC
-        ''', (analysis_id,))
-        
-        results = []
-        for row in cursor.fetchall():
-            if severity_levels.get(row['severity'], 0) >= min_level:
-                results.append(dict(row))
+            WHERE analysis_id = ? AND severity_rank >= ?
+            ORDER BY severity_rank DESC, chunk_id ASC
+        ''', (analysis_id, min_level))
         
-        return results
+        return [dict(row) for row in cursor.fetchall()]
     
     def get_all_summaries(self, analysis_id: int) -> List[Dict]:
         """Get all chunk summaries for an analysis"""
@@ -526,13 +714,13 @@ class ChunkIndex:
         all_errors = []
         all_api_calls = []
         all_perf_issues = []
-        all_patterns = set()
+        all_patterns = {}  # insertion-ordered set
         
         for summary in summaries:
-            all_errors.extend(json.loads(summary['errors_json']))
-            all_api_calls.extend(json.loads(summary['api_calls_json']))
-            all_perf_issues.extend(json.loads(summary['performance_issues_json']))
-            all_patterns.update(json.loads(summary['key_patterns_json']))
+            all_errors.extend(_json_loads(summary['errors_json']))
+            all_api_calls.extend(_json_loads(summary['api_calls_json']))
+            all_perf_issues.extend(_json_loads(summary['performance_issues_json']))
+            all_patterns.update(dict.fromkeys(_json_loads(summary['key_patterns_json'])))
         
         return {
             'total_chunks': len(summaries),
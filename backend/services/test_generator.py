@@ -1,18 +1,155 @@
 import os
 import re
 import json
-from typing import Dict, List, Any
+import asyncio
+import hashlib
+import httpx
+from cachetools import LRUCache
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
 from dotenv import load_dotenv
 
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # optional C-accelerated parser
+    _json_loads = json.loads
+
+# Provider SDKs are imported once; only the configured provider's is needed
+try:
+    import openai
+except ImportError:
+    openai = None
+
+try:
+    import anthropic
+except ImportError:
+    anthropic = None
+
+try:
+    import google.generativeai as genai
+except ImportError:
+    genai = None
+
 load_dotenv()
 
+class _ClientCache(LRUCache):
+    """LRU of provider clients that closes the clients it evicts"""
+    
+    def __init__(self, maxsize: int):
+        super().__init__(maxsize=maxsize)
+        self._closing = set()
+    
+    def popitem(self):
+        key, client = super().popitem()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:  # no loop to close on; the pool goes with the client
+            return key, client
+        task = loop.create_task(client.close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+        return key, client
+    
+    async def aclose(self) -> None:
+        """Close and drop every cached client"""
+        clients = list(self.values())
+        for key in list(self):
+            del self[key]
+        for client in clients:
+            await client.close()
+
+class _JSONArrayStream:
+    """Pick complete objects out of a JSON array as its text streams in"""
+    
+    _TOKEN_RE = re.compile(r'[\[\]{}"\\]')
+    
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.in_array = False
+        self.skip_to = -1
+        self.obj_start = None
+    
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """Add streamed text, returning the array's objects it completed"""
+        self.buffer += text
+        objects = []
+        for match in self._TOKEN_RE.finditer(self.buffer, self.pos):
+            pos = match.start()
+            if pos < self.skip_to:
+                continue
+            char = self.buffer[pos]
+            if self.in_string:
+                if char == '\\':
+                    self.skip_to = pos + 2
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                # Quotes only matter inside JSON, not in surrounding prose
+                self.in_string = self.depth > 0
+            elif char in '[{':
+                if self.depth == 0:
+                    self.in_array = char == '['
+                elif self.depth == 1 and self.in_array and char == '{':
+                    self.obj_start = pos
+                self.depth += 1
+            elif self.depth > 0:
+                self.depth -= 1
+                if self.depth == 1 and self.obj_start is not None and char == '}':
+                    try:
+                        obj = _json_loads(self.buffer[self.obj_start:pos + 1])
+                    except ValueError:
+                        obj = None
+                    if isinstance(obj, dict):
+                        objects.append(obj)
+                    self.obj_start = None
+                elif self.depth == 0:
+                    self.in_array = False
+        self.pos = len(self.buffer)
+        return objects
+
 class TestGenerator:
     """Generate test cases from log analysis using direct API calls"""
     
+    # Requirements and code style for the default prompt, kept terse since
+    # they're sent with every generation
+    _CRITICAL_RULES = """RULES:
+- Test ONLY what the analysis shows (errors, endpoints, performance issues), highest risk first
+- Executable code with imports and setup/teardown; follow the project context's conventions if given
+- Style: docstrings; Arrange-Act-Assert; descriptive names; helpers for reuse; assertion messages
+- Type hints (Python) or JSDoc (JavaScript); PEP 8 / Airbnb style; Path for file handling"""
+    
+    # Response parsing patterns, compiled once
+    _JSON_ARRAY_RE = re.compile(r'\[.*\]', re.DOTALL)
+    _JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+    _CODE_BLOCK_RE = re.compile(r'```(?:\w+)?\n(.*?)```', re.DOTALL)
+    _JSON_ARRAY_TOKEN_RE = re.compile(r'[\[\]"\\]')
+    
+    # API clients keyed by an API key digest and Gemini models keyed by
+    # (key digest, model_name, system prompt digest), shared across generator
+    # instances and bounded so rotated keys and edited prompts don't pile up
+    _openai_clients = _ClientCache(maxsize=64)
+    _anthropic_clients = _ClientCache(maxsize=64)
+    _gemini_models = LRUCache(maxsize=64)
+    
+    # Anthropic prompt-caching marker for stable prompt blocks
+    _EPHEMERAL_CACHE = {"type": "ephemeral"}
+    
     def __init__(self, ai_model: str = "gpt-4o", api_key: str = None):
         self.ai_model = ai_model
         self.api_key = api_key
         
+        # Client cache keys carry a digest of the API key, never the key itself
+        self._key_digest = hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+        
         # Determine provider and model
         if "gpt" in ai_model or "openai" in ai_model:
             self.provider = "openai"
@@ -41,17 +178,122 @@ class TestGenerator:
         if framework == "test-case":
             return await self._generate_test_scenarios(analysis_data, custom_prompt, system_prompt)
         
-        # Create test generation prompt
-        framework_templates = {
-            "jest": self._get_jest_template(),
-            "junit": self._get_junit_template(),
-            "pytest": self._get_pytest_template(),
-            "mocha": self._get_mocha_template(),
-            "cypress": self._get_cypress_template(),
-            "rspec": self._get_rspec_template()
-        }
+        stable_prompt, context_prompt, prompt, system_prompt = self._build_test_prompts(
+            analysis_data, framework, custom_prompt, system_prompt
+        )
+        
+        try:
+            if self.provider == "openai":
+                response = await self._call_openai(stable_prompt + context_prompt + prompt, system_prompt)
+            elif self.provider == "anthropic":
+                response = await self._call_anthropic(prompt, system_prompt, (stable_prompt, context_prompt))
+            elif self.provider == "google":
+                response = await self._call_google(stable_prompt + context_prompt + prompt, system_prompt)
+            else:
+                raise ValueError(f"Unsupported provider: {self.provider}")
+            
+            # Parse test cases from response
+            test_cases = self._parse_test_response(response, framework)
+            
+            # Reject template code - try regeneration once if detected
+            if self._contains_template_code(test_cases):
+                print("⚠️ Template code detected in first attempt, regenerating with stricter prompt...")
+                
+                # Add even stricter instruction around the analysis part, keeping the cacheable prefix
+                strict_prompt = f"""
+CRITICAL ERROR DETECTED: You returned template code in your previous attempt.
+
+{prompt}
+
+ABSOLUTELY FORBIDDEN PHRASES IN YOUR RESPONSE:
+- "Add your test logic here"
+- "expect(true).toBe(true)"
+- "Add your logic"
+- "TODO"
+- "FIXME"
+- "placeholder"
+
+EVERY LINE OF TEST CODE MUST BE FUNCTIONAL AND BASED ON THE ANALYSIS DATA.
+DO NOT USE ANY PLACEHOLDER TEXT OR GENERIC ASSERTIONS.
+"""
+                
+                if self.provider == "openai":
+                    response = await self._call_openai(stable_prompt + context_prompt + strict_prompt, system_prompt)
+                elif self.provider == "anthropic":
+                    response = await self._call_anthropic(strict_prompt, system_prompt, (stable_prompt, context_prompt))
+                elif self.provider == "google":
+                    response = await self._call_google(stable_prompt + context_prompt + strict_prompt, system_prompt)
+                
+            test_cases = self._parse_test_response(response, framework)
+            
+            return test_cases
+        except Exception as e:
+            # Return a sample test case on error
+            return [self._error_test_case(framework, e)]
+    
+    async def generate_tests_batch(self, items: List[Tuple[Dict[str, Any], str]], concurrency: int = 8, custom_prompt: str = None, system_prompt: str = None) -> List[List[Dict[str, Any]]]:
+        """
+        Generate tests for several (analysis_data, framework) pairs concurrently
+        
+        Each item is independent and network-bound, so at most `concurrency`
+        generations run at once. Results are returned in item order.
+        """
+        sem = asyncio.Semaphore(concurrency)
         
-        template = framework_templates.get(framework, framework_templates["jest"])
+        async def run(analysis_data: Dict[str, Any], framework: str) -> List[Dict[str, Any]]:
+            async with sem:
+                return await self.generate_tests(analysis_data, framework, custom_prompt, system_prompt)
+        
+        return await asyncio.gather(*(run(a, f) for a, f in items))
+    
+    async def generate_tests_stream(self, analysis_data: Dict[str, Any], framework: str, custom_prompt: str = None, system_prompt: str = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield test cases as the model writes them
+        
+        Each object of the response's JSON array is yielded once its closing
+        brace arrives; if none can be picked out incrementally, the full
+        response is parsed at the end like generate_tests. There is no
+        template-code regeneration pass, as earlier cases are already out.
+        """
+        if framework == "test-case":
+            for scenario in await self._generate_test_scenarios(analysis_data, custom_prompt, system_prompt):
+                yield scenario
+            return
+        
+        stable_prompt, context_prompt, prompt, system_prompt = self._build_test_prompts(
+            analysis_data, framework, custom_prompt, system_prompt
+        )
+        
+        parser = _JSONArrayStream()
+        parts = []
+        yielded = False
+        try:
+            if self.provider == "openai":
+                stream = self._stream_openai(stable_prompt + context_prompt + prompt, system_prompt)
+            elif self.provider == "anthropic":
+                stream = self._stream_anthropic(prompt, system_prompt, (stable_prompt, context_prompt))
+            elif self.provider == "google":
+                stream = self._stream_google(stable_prompt + context_prompt + prompt, system_prompt)
+            else:
+                raise ValueError(f"Unsupported provider: {self.provider}")
+            
+            async for text in stream:
+                parts.append(text)
+                for tc in parser.feed(text):
+                    yielded = True
+                    yield self._check_framework(tc, framework)
+        except Exception as e:
+            yield self._error_test_case(framework, e)
+            return
+        
+        if not yielded:
+            for tc in self._parse_test_response(''.join(parts), framework):
+                yield tc
+    
+    def _build_test_prompts(self, analysis_data: Dict[str, Any], framework: str, custom_prompt: str = None, system_prompt: str = None) -> Tuple[str, str, str, str]:
+        """Build (framework instructions, project context, analysis prompt, system prompt) for a framework"""
+        # Create test generation prompt
+        template = self._FRAMEWORK_TEMPLATES.get(framework, self._JEST_TEMPLATE)
         
         # Extract context information
         project_context = analysis_data.get('project_context', '')
@@ -93,11 +335,19 @@ Generate tests that:
 - Match the project's testing framework ({detected_framework or framework})
 - Use appropriate file paths based on project structure
 - Include proper mocking for dependencies
+"""
+        
+        # The prompt is assembled as framework instructions + project context +
+        # analysis data, most stable first, so providers can cache the prefix
+        context_prompt = f"""
+{git_context_instructions}
+
+{context_instructions}
 """
         
         if custom_prompt:
             # Use custom prompt
-            prompt = f"""
+            stable_prompt = f"""
 ⚠️ CRITICAL: Generate test cases EXCLUSIVELY for {framework.upper()} framework! ⚠️
 
 TARGET FRAMEWORK: {framework.upper()}
@@ -112,10 +362,10 @@ IMPORTANT INSTRUCTIONS:
 
 {custom_prompt}
 
-{git_context_instructions}
-
-{context_instructions}
-
+REFERENCE TEMPLATE (use structure but fill with REAL test logic):
+{template}
+"""
+            prompt = f"""
 ANALYSIS DATA:
 Log File: {analysis_data.get('filename', 'unknown')}
 Log Size: {analysis_data.get('log_size_full', 0)} characters
@@ -131,9 +381,6 @@ LOG EXCERPT: ```
 
 FRAMEWORK: {framework.upper()}
 
-REFERENCE TEMPLATE (use structure but fill with REAL test logic):
-{template}
-
 ⚠️ FINAL CHECKS:
 1. Are tests based on ACTUAL log data, not generic examples?
 2. Is code valid {framework.upper()} syntax?
@@ -151,7 +398,7 @@ Respond with a JSON array of test cases:
 """
         else:
             # Use default prompt with STRONG framework emphasis
-            prompt = f"""
+            stable_prompt = f"""
 ⚠️ CRITICAL: Generate test cases EXCLUSIVELY for {framework.upper()} framework! ⚠️
 
 TARGET FRAMEWORK: {framework.upper()}
@@ -174,11 +421,13 @@ LANGUAGE: {"JavaScript/TypeScript" if framework.lower() in ['jest', 'mocha', 'cy
 ✅ Assertions validating SPECIFIC conditions from the analysis
 ✅ At least 15-20 lines of meaningful test code per test
 
-Based on the following log analysis, generate comprehensive test cases using {framework.upper()}:
-
-{git_context_instructions}
+{self._CRITICAL_RULES}
 
-{context_instructions}
+REFERENCE TEMPLATE (use this structure but fill with REAL test logic):
+{template}
+"""
+            prompt = f"""
+Based on the following log analysis, generate comprehensive test cases using {framework.upper()}:
 
 ANALYSIS DATA:
 Log File: {analysis_data.get('filename', 'unknown')}
@@ -201,31 +450,6 @@ LOG EXCERPT (Representative Sample):
 {analysis_data.get('log_excerpt', 'No log excerpt available')[:2000]}
 ```
 
-Requirements:
-1. Generate {framework.upper()} test cases for identified errors and API endpoints FROM THE ANALYSIS DATA
-2. Include proper imports and setup/teardown (matching project structure if context provided)
-3. Add assertions for ACTUAL error conditions found in logs, NOT generic examples
-4. Prioritize tests by risk score (critical errors first)
-5. Make tests executable and production-ready with REAL test logic
-6. Use project-specific patterns and conventions if context is available
-7. EVERY test MUST validate something SPECIFIC from the log analysis
-
-CODE FORMATTING STANDARDS (CRITICAL):
-- Add comprehensive docstrings explaining purpose, parameters, and expected behavior
-- Use Arrange-Act-Assert pattern with clear comment sections
-- Include inline comments explaining WHY decisions are made
-- Organize tests into logical classes/groups
-- Use descriptive variable names (no single letters except loops)
-- Add helper functions for reusable logic
-- Include detailed assertion messages that aid debugging
-- Use Path library for file handling (cross-platform compatibility)
-- Add type hints where applicable (Python) or JSDoc (JavaScript)
-- Follow PEP 8 (Python) or Airbnb style guide (JavaScript)
-- Structure: Imports → Constants → Fixtures/Setup → Test Classes → Helper Functions
-
-REFERENCE TEMPLATE (use this structure but fill with REAL test logic):
-{template}
-
 Generate at least 3-5 test cases covering:
 - Specific error scenarios from logs (e.g., if log shows circular reference, test for that)
 - Specific API endpoints mentioned in logs (not generic /api/endpoint)
@@ -249,10 +473,9 @@ Respond with a JSON array of test cases:
 ]
 """
         
-        try:
-            # Use custom or default system prompt with EXPLICIT framework specification
-            if not system_prompt:
-                system_prompt = f"""You are an expert test automation engineer specializing EXCLUSIVELY in {framework.upper()}.
+        # Use custom or default system prompt with EXPLICIT framework specification
+        if not system_prompt:
+            system_prompt = f"""You are an expert test automation engineer specializing EXCLUSIVELY in {framework.upper()}.
 
 CRITICAL REQUIREMENTS:
 - You MUST generate {framework.upper()} tests ONLY
@@ -269,59 +492,8 @@ If the framework is:
 - rspec: Use Ruby with RSpec syntax
 
 VERIFY before responding: Does your test code match the {framework.upper()} framework?"""
-            
-            if self.provider == "openai":
-                response = await self._call_openai(prompt, system_prompt)
-            elif self.provider == "anthropic":
-                response = await self._call_anthropic(prompt, system_prompt)
-            elif self.provider == "google":
-                response = await self._call_google(prompt, system_prompt)
-            else:
-                raise ValueError(f"Unsupported provider: {self.provider}")
-            
-            # Parse test cases from response
-            test_cases = self._parse_test_response(response, framework)
-            
-            # Reject template code - try regeneration once if detected
-            if self._contains_template_code(test_cases):
-                print("⚠️ Template code detected in first attempt, regenerating with stricter prompt...")
-                
-                # Add even stricter instruction
-                strict_prompt = f"""
-CRITICAL ERROR DETECTED: You returned template code in your previous attempt.
-
-{prompt}
-
-ABSOLUTELY FORBIDDEN PHRASES IN YOUR RESPONSE:
-- "Add your test logic here"
-- "expect(true).toBe(true)"
-- "Add your logic"
-- "TODO"
-- "FIXME"
-- "placeholder"
-
-EVERY LINE OF TEST CODE MUST BE FUNCTIONAL AND BASED ON THE ANALYSIS DATA.
-DO NOT USE ANY PLACEHOLDER TEXT OR GENERIC ASSERTIONS.
-"""
-                
-                if self.provider == "openai":
-                    response = await self._call_openai(strict_prompt, system_prompt)
-                elif self.provider == "anthropic":
-                    response = await self._call_anthropic(strict_prompt, system_prompt)
-                elif self.provider == "google":
-                    response = await self._call_google(strict_prompt, system_prompt)
-                
-            test_cases = self._parse_test_response(response, framework)
-            
-            return test_cases
-        except Exception as e:
-            # Return a sample test case on error
-            return [{
-                "description": f"Sample {framework} test - Error during generation: {str(e)}",
-                "priority": "low",
-                "risk_score": 0.1,
-                "test_code": self._get_sample_test(framework)
-            }]
+        
+        return stable_prompt, context_prompt, prompt, system_prompt
     
     async def _generate_test_scenarios(self, analysis_data: Dict[str, Any], custom_prompt: str = None, system_prompt: str = None) -> List[Dict[str, Any]]:
         """
@@ -454,72 +626,158 @@ Acceptance Criteria:
                 "framework": "test-case"
             }]
     
-    async def _call_openai(self, prompt: str, system_prompt: str) -> str:
-        """Call OpenAI API directly"""
-        import openai
+    @staticmethod
+    def _http_client() -> httpx.AsyncClient:
+        """Keep-alive connection pool (HTTP/2 when available) for a provider client"""
+        return httpx.AsyncClient(
+            http2=_HTTP2,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+        )
+    
+    @classmethod
+    async def aclose(cls) -> None:
+        """Close the shared provider clients and their connection pools"""
+        for clients in (cls._openai_clients, cls._anthropic_clients):
+            await clients.aclose()
+    
+    def _openai_client(self):
+        """Shared AsyncOpenAI client for this generator's API key"""
+        if openai is None:
+            raise ImportError("openai package is not installed")
+        
+        client = self._openai_clients.get(self._key_digest)
+        if client is None:
+            client = self._openai_clients[self._key_digest] = openai.AsyncOpenAI(
+                api_key=self.api_key, http_client=self._http_client()
+            )
+        return client
+    
+    def _anthropic_client(self):
+        """Shared AsyncAnthropic client for this generator's API key"""
+        if anthropic is None:
+            raise ImportError("anthropic package is not installed")
         
-        client = openai.AsyncOpenAI(api_key=self.api_key)
+        client = self._anthropic_clients.get(self._key_digest)
+        if client is None:
+            client = self._anthropic_clients[self._key_digest] = anthropic.AsyncAnthropic(
+                api_key=self.api_key, http_client=self._http_client()
+            )
+        return client
+    
+    def _gemini_model(self, system_prompt: str):
+        """Cached Gemini model for this API key, model name and system prompt"""
+        if genai is None:
+            raise ImportError("google-generativeai package is not installed")
         
-        response = await client.chat.completions.create(
-            model=self.model_name,
-            messages=[
+        key = (self._key_digest, self.model_name, hashlib.sha256(system_prompt.encode()).hexdigest())
+        model = self._gemini_models.get(key)
+        if model is None:
+            genai.configure(api_key=self.api_key)
+            model = genai.GenerativeModel(
+                model_name=self.model_name,
+                system_instruction=system_prompt
+            )
+            self._gemini_models[key] = model
+        return model
+    
+    def _openai_request(self, prompt: str, system_prompt: str) -> Dict[str, Any]:
+        """Chat completion arguments shared by the plain and streaming calls"""
+        return {
+            "model": self.model_name,
+            "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": prompt}
             ],
+            "temperature": 0.7,  # Increased for more creative, specific responses
+            "max_tokens": 4000
+        }
+    
+    def _anthropic_request(self, prompt: str, system_prompt: str, cached_prefix: Tuple[str, ...] = ()) -> Dict[str, Any]:
+        """
+        Messages arguments shared by the plain and streaming calls
+        
+        The system prompt and each non-empty `cached_prefix` block (sent
+        before `prompt`) are marked for prompt caching, so repeat generations
+        only pay full input cost for the analysis-specific part.
+        """
+        return {
+            "model": self.model_name,
+            "max_tokens": 4000,
+            "temperature": 0.7,  # Increased for more creative, specific responses
+            "system": [{"type": "text", "text": system_prompt, "cache_control": self._EPHEMERAL_CACHE}],
+            "messages": [
+                {"role": "user", "content": [
+                    *({"type": "text", "text": block, "cache_control": self._EPHEMERAL_CACHE}
+                      for block in cached_prefix if block.strip()),
+                    {"type": "text", "text": prompt}
+                ]}
+            ],
+            "extra_headers": {"anthropic-beta": "prompt-caching-2024-07-31"}
+        }
+    
+    def _gemini_config(self):
+        """Generation settings for Gemini calls"""
+        return genai.GenerationConfig(
             temperature=0.7,  # Increased for more creative, specific responses
-            max_tokens=4000
+            max_output_tokens=4000
         )
-        
+    
+    async def _call_openai(self, prompt: str, system_prompt: str) -> str:
+        """Call OpenAI API directly"""
+        client = self._openai_client()
+        response = await client.chat.completions.create(**self._openai_request(prompt, system_prompt))
         return response.choices[0].message.content
     
-    async def _call_anthropic(self, prompt: str, system_prompt: str) -> str:
+    async def _call_anthropic(self, prompt: str, system_prompt: str, cached_prefix: Tuple[str, ...] = ()) -> str:
         """Call Anthropic API directly"""
-        import anthropic
-        
-        client = anthropic.AsyncAnthropic(api_key=self.api_key)
-        
-        response = await client.messages.create(
-            model=self.model_name,
-            max_tokens=4000,
-            temperature=0.7,  # Increased for more creative, specific responses
-            system=system_prompt,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        
+        client = self._anthropic_client()
+        response = await client.messages.create(**self._anthropic_request(prompt, system_prompt, cached_prefix))
         return response.content[0].text
     
     async def _call_google(self, prompt: str, system_prompt: str) -> str:
         """Call Google Gemini API directly"""
-        import google.generativeai as genai
-        
-        genai.configure(api_key=self.api_key)
-        model = genai.GenerativeModel(
-            model_name=self.model_name,
-            system_instruction=system_prompt
-        )
-        
-        generation_config = genai.GenerationConfig(
-            temperature=0.7,  # Increased for more creative, specific responses
-            max_output_tokens=4000
-        )
-        
+        model = self._gemini_model(system_prompt)
         response = await model.generate_content_async(
             prompt,
-            generation_config=generation_config
+            generation_config=self._gemini_config()
         )
         return response.text
     
+    async def _stream_openai(self, prompt: str, system_prompt: str) -> AsyncIterator[str]:
+        """Stream OpenAI response text as it is generated"""
+        client = self._openai_client()
+        stream = await client.chat.completions.create(**self._openai_request(prompt, system_prompt), stream=True)
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    async def _stream_anthropic(self, prompt: str, system_prompt: str, cached_prefix: Tuple[str, ...] = ()) -> AsyncIterator[str]:
+        """Stream Anthropic response text as it is generated"""
+        client = self._anthropic_client()
+        async with client.messages.stream(**self._anthropic_request(prompt, system_prompt, cached_prefix)) as stream:
+            async for text in stream.text_stream:
+                yield text
+    
+    async def _stream_google(self, prompt: str, system_prompt: str) -> AsyncIterator[str]:
+        """Stream Gemini response text as it is generated"""
+        model = self._gemini_model(system_prompt)
+        response = await model.generate_content_async(
+            prompt,
+            generation_config=self._gemini_config(),
+            stream=True
+        )
+        async for chunk in response:
+            yield chunk.text
+    
     def _extract_json(self, response: str) -> str:
         """Extract JSON array or object from AI response"""
         # Try to find JSON array first
-        json_match = re.search(r'\[.*\]', response, re.DOTALL)
+        json_match = self._JSON_ARRAY_RE.search(response)
         if json_match:
             return json_match.group()
         
         # Try to find JSON object
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
+        json_match = self._JSON_OBJECT_RE.search(response)
         if json_match:
             return json_match.group()
         
@@ -550,125 +808,173 @@ Acceptance Criteria:
         
         return False
     
+    # Framework-specific validation patterns: (pattern, must match)
+    _VALIDATION_PATTERNS = {
+        'jest': [
+            # Jest uses global functions, doesn't require jest imports
+            (r'describe\s*\(', True),  # Describe blocks (required)
+            (r'(test|it)\s*\(', True),  # Test blocks (required)
+            (r'expect\s*\(', True),  # Assertions (required)
+            (r'import\s+pytest', False),  # Should NOT have pytest
+            (r'@pytest', False),  # Should NOT have pytest decorators
+            (r'def\s+test_', False),  # Should NOT have Python test functions
+        ],
+        'mocha': [
+            (r'describe\s*\(', True),  # Describe blocks (required)
+            (r'it\s*\(', True),  # Test blocks (required)
+            (r'(expect|assert)', True),  # Assertions (required)
+            (r'import\s+pytest', False),  # Should NOT have pytest
+            (r'@pytest', False),  # Should NOT have pytest decorators
+            (r'def\s+test_', False),  # Should NOT have Python test functions
+        ],
+        'cypress': [
+            (r'cy\.', True),  # Cypress commands (required)
+            (r'describe\s*\(', True),  # Describe blocks (required)
+            (r'it\s*\(', True),  # Test blocks (required)
+            (r'import\s+pytest', False),  # Should NOT have pytest
+            (r'@pytest', False),  # Should NOT have pytest decorators
+            (r'def\s+test_', False),  # Should NOT have Python test functions
+        ],
+        'pytest': [
+            (r'import\s+pytest', True),  # Pytest imports (required)
+            (r'def\s+test_', True),  # Test functions (required)
+            # Note: @pytest decorators are optional, not validating them
+            (r'describe\s*\(', False),  # Should NOT have JS describe
+            (r'it\s*\(', False),  # Should NOT have JS it
+            (r'@Test', False),  # Should NOT have Java annotations
+        ],
+        'junit': [
+            (r'@Test', True),  # JUnit annotations
+            (r'import.*org\.junit', True),  # JUnit imports
+            (r'public\s+(void|class)', True),  # Java syntax
+            (r'import\s+pytest', False),
+            (r'describe\s*\(', False),
+        ],
+        'rspec': [
+            (r'describe\s+[\'"]', True),  # RSpec describe
+            (r'it\s+[\'"]', True),  # RSpec it
+            (r'expect\s*\(', True),  # RSpec expectations
+            (r'import\s+pytest', False),
+            (r'import.*from', False),  # Should NOT have JS imports
+        ]
+    }
+    _VALIDATION_RES = {  # compiled once
+        fw: [(re.compile(pattern, re.MULTILINE | re.IGNORECASE), should_match) for pattern, should_match in patterns]
+        for fw, patterns in _VALIDATION_PATTERNS.items()
+    }
+    
     def _validate_framework_match(self, test_code: str, framework: str) -> bool:
         """Validate that the test code matches the expected framework"""
         framework_lower = framework.lower()
         
-        # Framework-specific validation patterns
-        validation_patterns = {
-            'jest': [
-                # Jest uses global functions, doesn't require jest imports
-                (r'describe\s*\(', True),  # Describe blocks (required)
-                (r'(test|it)\s*\(', True),  # Test blocks (required)
-                (r'expect\s*\(', True),  # Assertions (required)
-                (r'import\s+pytest', False),  # Should NOT have pytest
-                (r'@pytest', False),  # Should NOT have pytest decorators
-                (r'def\s+test_', False),  # Should NOT have Python test functions
-            ],
-            'mocha': [
-                (r'describe\s*\(', True),  # Describe blocks (required)
-                (r'it\s*\(', True),  # Test blocks (required)
-                (r'(expect|assert)', True),  # Assertions (required)
-                (r'import\s+pytest', False),  # Should NOT have pytest
-                (r'@pytest', False),  # Should NOT have pytest decorators
-                (r'def\s+test_', False),  # Should NOT have Python test functions
-            ],
-            'cypress': [
-                (r'cy\.', True),  # Cypress commands (required)
-                (r'describe\s*\(', True),  # Describe blocks (required)
-                (r'it\s*\(', True),  # Test blocks (required)
-                (r'import\s+pytest', False),  # Should NOT have pytest
-                (r'@pytest', False),  # Should NOT have pytest decorators
-                (r'def\s+test_', False),  # Should NOT have Python test functions
-            ],
-            'pytest': [
-                (r'import\s+pytest', True),  # Pytest imports (required)
-                (r'def\s+test_', True),  # Test functions (required)
-                # Note: @pytest decorators are optional, not validating them
-                (r'describe\s*\(', False),  # Should NOT have JS describe
-                (r'it\s*\(', False),  # Should NOT have JS it
-                (r'@Test', False),  # Should NOT have Java annotations
-            ],
-            'junit': [
-                (r'@Test', True),  # JUnit annotations
-                (r'import.*org\.junit', True),  # JUnit imports
-                (r'public\s+(void|class)', True),  # Java syntax
-                (r'import\s+pytest', False),
-                (r'describe\s*\(', False),
-            ],
-            'rspec': [
-                (r'describe\s+[\'"]', True),  # RSpec describe
-                (r'it\s+[\'"]', True),  # RSpec it
-                (r'expect\s*\(', True),  # RSpec expectations
-                (r'import\s+pytest', False),
-                (r'import.*from', False),  # Should NOT have JS imports
-            ]
-        }
-        
-        if framework_lower not in validation_patterns:
+        if framework_lower not in self._VALIDATION_RES:
             return True  # Unknown framework, skip validation
         
-        patterns = validation_patterns[framework_lower]
+        patterns = self._VALIDATION_RES[framework_lower]
         for pattern, should_match in patterns:
-            has_match = bool(re.search(pattern, test_code, re.MULTILINE | re.IGNORECASE))
+            has_match = bool(pattern.search(test_code))
             if should_match and not has_match:
                 # Required pattern not found
                 return False
             if not should_match and has_match:
                 # Forbidden pattern found (wrong framework)
-                print(f"⚠️ WARNING: Found wrong framework pattern '{pattern}' in {framework} test code")
+                print(f"⚠️ WARNING: Found wrong framework pattern '{pattern.pattern}' in {framework} test code")
                 return False
         
         return True
     
     def _parse_test_response(self, response: str, framework: str) -> List[Dict[str, Any]]:
         """Parse AI response into test cases"""
-        try:
-            # Try to extract JSON array from response
-            json_match = re.search(r'\[.*\]', response, re.DOTALL)
-            if json_match:
-                test_cases = json.loads(json_match.group())
-                test_cases = test_cases if isinstance(test_cases, list) else [test_cases]
-                
-                # Validate each test case matches the framework
-                validated_cases = []
-                for tc in test_cases:
-                    test_code = tc.get('test_code', '')
-                    if self._validate_framework_match(test_code, framework):
-                        validated_cases.append(tc)
-                    else:
-                        print(f"⚠️ Rejected test case: Framework mismatch (expected {framework})")
-                        # Try to add a warning to the test case
-                        tc['description'] = f"⚠️ FRAMEWORK MISMATCH - {tc.get('description', 'Test')}"
-                        tc['test_code'] = f"// ERROR: Generated code does not match {framework} framework\n// Please regenerate tests\n\n{test_code}"
-                        validated_cases.append(tc)
-                
-                return validated_cases if validated_cases else test_cases
-            else:
-                # Fallback: create sample test
-                return [{
-                    "description": f"Generated {framework} test from analysis",
-                    "priority": "medium",
-                    "risk_score": 0.5,
-                    "test_code": self._extract_code_blocks(response, framework)
-                }]
-        except json.JSONDecodeError:
-            return [{
-                "description": f"Generated {framework} test",
-                "priority": "medium",
-                "risk_score": 0.5,
-                "test_code": self._extract_code_blocks(response, framework)
-            }]
+        # Try to extract a JSON array of test cases from response
+        test_cases = self._load_test_cases(response)
+        if test_cases is not None:
+            # Validate each test case matches the framework
+            return [self._check_framework(tc, framework) for tc in test_cases]
+        
+        # Fallback: create sample test
+        return [{
+            "description": f"Generated {framework} test from analysis",
+            "priority": "medium",
+            "risk_score": 0.5,
+            "test_code": self._extract_code_blocks(response, framework)
+        }]
+    
+    def _check_framework(self, tc: Dict[str, Any], framework: str) -> Dict[str, Any]:
+        """Flag a parsed test case whose code doesn't match the framework"""
+        test_code = tc.get('test_code', '')
+        if not self._validate_framework_match(test_code, framework):
+            print(f"⚠️ Rejected test case: Framework mismatch (expected {framework})")
+            # Try to add a warning to the test case
+            tc['description'] = f"⚠️ FRAMEWORK MISMATCH - {tc.get('description', 'Test')}"
+            tc['test_code'] = f"// ERROR: Generated code does not match {framework} framework\n// Please regenerate tests\n\n{test_code}"
+        return tc
+    
+    @classmethod
+    def _load_test_cases(cls, text: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return the test case objects of the first JSON array in text holding any, or None
+        
+        Prose may contain brackets of its own ("Here are [3] tests: ..."), so a
+        span that doesn't parse, or has no objects, moves the scan on to the
+        next '['. Non-object items are dropped. An empty array is returned
+        only if no later span holds objects.
+        """
+        empty = None
+        start = text.find('[')
+        while start != -1:
+            span = cls._find_json_array(text, start)
+            try:
+                items = _json_loads(span) if span else None
+            except ValueError:
+                items = None
+            if isinstance(items, list):
+                test_cases = [item for item in items if isinstance(item, dict)]
+                if test_cases:
+                    return test_cases
+                if not items and empty is None:
+                    empty = []
+            if span is None:
+                break
+            start = text.find('[', start + 1)
+        return empty
+    
+    @classmethod
+    def _find_json_array(cls, text: str, start: int) -> Optional[str]:
+        """Return the '[' at start ... matching ']' span of text (string-aware), or None"""
+        depth = 0
+        in_string = False
+        skip_to = -1
+        for match in cls._JSON_ARRAY_TOKEN_RE.finditer(text, start):
+            pos = match.start()
+            if pos < skip_to:
+                continue
+            char = text[pos]
+            if in_string:
+                if char == '\\':
+                    skip_to = pos + 2
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == '[':
+                depth += 1
+            elif char == ']':
+                depth -= 1
+                if depth == 0:
+                    return text[start:pos + 1]
+        
+        # Unbalanced (e.g. truncated): span to the last ']' as before
+        end = text.rfind(']')
+        return text[start:end + 1] if end > start else None
     
     def _extract_code_blocks(self, text: str, framework: str) -> str:
         """Extract code blocks from markdown response"""
-        code_blocks = re.findall(r'```(?:\w+)?\n(.*?)```', text, re.DOTALL)
+        code_blocks = self._CODE_BLOCK_RE.findall(text)
         if code_blocks:
             return code_blocks[0]
         return self._get_sample_test(framework)
     
-    def _get_jest_template(self) -> str:
-        return """
+    _JEST_TEMPLATE = """
 JEST Template - Generate PRODUCTION-READY tests with this structure:
 
 ```javascript
@@ -731,8 +1037,10 @@ IMPORTANT FORMATTING RULES:
 - Add inline comments explaining complex logic
 """
     
-    def _get_junit_template(self) -> str:
-        return """
+    def _get_jest_template(self) -> str:
+        return self._JEST_TEMPLATE
+    
+    _JUNIT_TEMPLATE = """
 JUNIT Template Example:
 ```java
 import static io.restassured.RestAssured.given;
@@ -750,8 +1058,10 @@ public class ApiTests {
 ```
 """
     
-    def _get_pytest_template(self) -> str:
-        return """
+    def _get_junit_template(self) -> str:
+        return self._JUNIT_TEMPLATE
+    
+    _PYTEST_TEMPLATE = """
 PYTEST Template - Generate PRODUCTION-READY tests with this structure:
 
 ```python
@@ -949,8 +1259,10 @@ IMPORTANT FORMATTING RULES:
 - Group related fixtures together
 """
     
-    def _get_mocha_template(self) -> str:
-        return """
+    def _get_pytest_template(self) -> str:
+        return self._PYTEST_TEMPLATE
+    
+    _MOCHA_TEMPLATE = """
 MOCHA Template Example:
 ```javascript
 const chai = require('chai');
@@ -972,8 +1284,10 @@ describe('API Tests', function() {
 ```
 """
     
-    def _get_cypress_template(self) -> str:
-        return """
+    def _get_mocha_template(self) -> str:
+        return self._MOCHA_TEMPLATE
+    
+    _CYPRESS_TEMPLATE = """
 CYPRESS Template Example:
 ```javascript
 describe('API E2E Tests', () => {
@@ -997,8 +1311,10 @@ describe('API E2E Tests', () => {
 ```
 """
     
-    def _get_rspec_template(self) -> str:
-        return """
+    def _get_cypress_template(self) -> str:
+        return self._CYPRESS_TEMPLATE
+    
+    _RSPEC_TEMPLATE = """
 RSPEC Template Example:
 ```ruby
 require 'rails_helper'
@@ -1021,6 +1337,19 @@ end
 ```
 """
     
+    def _get_rspec_template(self) -> str:
+        return self._RSPEC_TEMPLATE
+    
+    # Built once; generate_tests picks the reference template from here
+    _FRAMEWORK_TEMPLATES = {
+        "jest": _JEST_TEMPLATE,
+        "junit": _JUNIT_TEMPLATE,
+        "pytest": _PYTEST_TEMPLATE,
+        "mocha": _MOCHA_TEMPLATE,
+        "cypress": _CYPRESS_TEMPLATE,
+        "rspec": _RSPEC_TEMPLATE
+    }
+    
     def _format_patterns(self, patterns: List[Dict], limit: int = 10) -> str:
         """
         Format error patterns - OPTIMIZED for tokens
@@ -1133,10 +1462,8 @@ end
         
         return '\n'.join(formatted)
     
-    def _get_sample_test(self, framework: str) -> str:
-        """Return a sample test case"""
-        samples = {
-            "jest": """import request from 'supertest';
+    _SAMPLE_TESTS = {
+        "jest": """import request from 'supertest';
 
 describe('Sample Test', () => {
   it('should return 200', async () => {
@@ -1144,7 +1471,7 @@ describe('Sample Test', () => {
     expect(true).toBe(true);
   });
 });""",
-            "junit": """import org.junit.Test;
+        "junit": """import org.junit.Test;
 import static org.junit.Assert.*;
 
 public class SampleTest {
@@ -1153,12 +1480,12 @@ public class SampleTest {
     assertTrue(true);
   }
 }""",
-            "pytest": """import pytest
+        "pytest": """import pytest
 
 def test_sample():
     assert True
 """,
-            "mocha": """const chai = require('chai');
+        "mocha": """const chai = require('chai');
 const expect = chai.expect;
 
 describe('Sample Test', function() {
@@ -1166,13 +1493,13 @@ describe('Sample Test', function() {
     expect(true).to.be.true;
   });
 });""",
-            "cypress": """describe('Sample E2E Test', () => {
+        "cypress": """describe('Sample E2E Test', () => {
   it('should load the page', () => {
     cy.visit('/');
     cy.contains('Welcome').should('be.visible');
   });
 });""",
-            "rspec": """require 'rails_helper'
+        "rspec": """require 'rails_helper'
 
 RSpec.describe 'Sample Test' do
   it 'should return true' do
@@ -1180,5 +1507,17 @@ RSpec.describe 'Sample Test' do
   end
 end
 """
+    }
+    
+    def _error_test_case(self, framework: str, error: Exception) -> Dict[str, Any]:
+        """Sample test case reporting a failed generation"""
+        return {
+            "description": f"Sample {framework} test - Error during generation: {str(error)}",
+            "priority": "low",
+            "risk_score": 0.1,
+            "test_code": self._get_sample_test(framework)
         }
-        return samples.get(framework, samples["jest"])
+    
+    def _get_sample_test(self, framework: str) -> str:
+        """Return a sample test case"""
+        return self._SAMPLE_TESTS.get(framework, self._SAMPLE_TESTS["jest"])
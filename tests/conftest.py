@@ -0,0 +1,11 @@
+"""
+Shared pytest setup: make the backend importable (as `services.*`, the way
+server.py imports it) for the unit tests that don't need a running server.
+"""
+
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
@@ -0,0 +1,155 @@
+"""
+GitClient Local Clone Test Suite
+
+Unit tests (no server or network needed) for GitClient(local_clone=True):
+reads and listings are served from a shallow fetch of a temporary git
+repository instead of the provider API.
+"""
+
+import shutil
+import subprocess
+
+import pytest
+
+from services import git_client as git_client_module
+from services.git_client import GitClient, FileEntry
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason="git is not installed")
+
+FILES = {
+    "README.md": "# Demo\n",
+    "src/app.py": "print('hello')\n",
+    "src/lib/util.py": "def util():\n    return 1\n",
+}
+
+
+def git(cwd, *args):
+    """Run git in cwd, returning stdout"""
+    return subprocess.run(
+        ['git', '-c', 'user.name=Test', '-c', 'user.email=test@example.com', *args],
+        cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+@pytest.fixture
+def origin(tmp_path):
+    """A repository with FILES committed on main, standing in for the provider remote"""
+    repo = tmp_path / "origin"
+    repo.mkdir()
+    git(repo, 'init', '--quiet', '--initial-branch=main')
+    for path, content in FILES.items():
+        (repo / path).parent.mkdir(parents=True, exist_ok=True)
+        (repo / path).write_text(content)
+    git(repo, 'add', '.')
+    git(repo, 'commit', '--quiet', '-m', 'initial')
+    return repo
+
+
+@pytest.fixture
+def clone_root(tmp_path, monkeypatch):
+    """Local clones go under a temporary root"""
+    root = tmp_path / "clones"
+    monkeypatch.setattr(git_client_module, '_LOCAL_CLONE_ROOT', root)
+    return root
+
+
+def make_client(origin, repository="acme/demo", provider="github"):
+    """GitClient fetching from origin; any provider API call fails the test"""
+    client = GitClient(provider=provider, token="test-token", repository=repository, local_clone=True)
+    client.CLONE_URLS = {provider: origin.as_uri()}
+    
+    def no_api(*args, **kwargs):
+        raise AssertionError("unexpected provider API call")
+    client._get = no_api
+    return client
+
+
+class TestLocalClone:
+    """Test reads and listings served from the local clone"""
+    
+    def test_read_file(self, origin, clone_root):
+        """Test a file is read from the fetched ref"""
+        with make_client(origin) as client:
+            assert client.get_file_content("src/app.py", "main") == FILES["src/app.py"]
+            assert (clone_root / "github" / "acme" / "demo" / "HEAD").exists()
+    
+    def test_read_batch_skips_missing(self, origin, clone_root):
+        """Test a batch read returns existing files and drops missing ones"""
+        with make_client(origin) as client:
+            contents = client.get_files_batch(["README.md", "src/lib/util.py", "nope.txt"], "main")
+        
+        assert contents == {"README.md": FILES["README.md"], "src/lib/util.py": FILES["src/lib/util.py"]}
+    
+    def test_read_by_commit_sha(self, origin, clone_root):
+        """Test reads pinned to a commit sha"""
+        sha = git(origin, 'rev-parse', 'HEAD')
+        with make_client(origin) as client:
+            assert client.get_file_content("README.md", sha) == FILES["README.md"]
+    
+    def test_list_directory(self, origin, clone_root):
+        """Test a non-recursive listing of a directory"""
+        with make_client(origin) as client:
+            entries = client.list_files("src", "main")
+        
+        assert entries == [
+            FileEntry(path="src/app.py", name="app.py", type="file"),
+            FileEntry(path="src/lib", name="lib", type="dir"),
+        ]
+    
+    def test_list_recursive(self, origin, clone_root):
+        """Test a recursive listing from the root includes directories and nested files"""
+        with make_client(origin) as client:
+            paths = {entry.path for entry in client.list_files("", "main", recursive=True)}
+        
+        assert paths == {"README.md", "src", "src/app.py", "src/lib", "src/lib/util.py"}
+    
+    def test_provider_listing_types(self, origin, clone_root):
+        """Test entry types use the provider's names"""
+        with make_client(origin, repository="group/sub/demo", provider="gitlab") as client:
+            types = {entry.name: entry.type for entry in client.list_files("src", "main")}
+        
+        assert types == {"app.py": "blob", "lib": "tree"}
+    
+    @pytest.mark.parametrize("query,extension,paths", [
+        ("util", None, ["src/lib/util.py"]),
+        ("LIB", None, ["src/lib/util.py"]),
+        ("src", ".py", ["src/app.py", "src/lib/util.py"]),
+        ("", (".md", ".txt"), ["README.md"]),
+    ])
+    def test_search_files(self, origin, clone_root, query, extension, paths):
+        """Test search matches case-insensitive substrings of the whole path, files only"""
+        with make_client(origin) as client:
+            found = client.search_files(query, extension)
+        
+        assert sorted(entry.path for entry in found) == paths
+    
+    def test_unknown_ref(self, origin, clone_root):
+        """Test an unknown ref doesn't resolve to a local commit"""
+        with make_client(origin) as client:
+            assert client._local_commit("no-such-branch") is None
+
+
+class TestCloneRepositoryValidation:
+    """Test repository names are validated before they become clone paths"""
+    
+    @pytest.mark.parametrize("repository", [
+        "../escape", "acme/..", "acme/../../escape", "./demo", "/acme/demo",
+        "acme", "acme/demo/", "acme//demo", "acme/demo/extra",
+    ])
+    def test_rejects_invalid_repository(self, origin, clone_root, repository):
+        """Test invalid names never fetch or create directories"""
+        with make_client(origin, repository=repository) as client:
+            assert client._local_commit("main") is None
+        
+        assert not clone_root.exists()
+    
+    @pytest.mark.parametrize("provider,repository", [
+        ("github", "acme/.github"),
+        ("gitlab", "group/sub/demo"),
+    ])
+    def test_accepts_valid_repository(self, origin, clone_root, provider, repository):
+        """Test owner/name (and GitLab nested groups) are accepted"""
+        with make_client(origin, repository=repository, provider=provider) as client:
+            assert client._local_commit("main") == git(origin, 'rev-parse', 'HEAD')
+        
+        assert (clone_root / provider / repository / "HEAD").exists()
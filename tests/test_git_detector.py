@@ -0,0 +1,163 @@
+"""
+GitRepositoryDetector Test Suite
+
+Unit tests (no server needed) for the detection cascade: which pattern wins
+when a log matches several, and which CI/CD variable wins when a log sets
+more than one.
+"""
+
+import pytest
+
+from services.git_detector import GitRepositoryDetector
+
+# One line per detection method, from highest to lowest priority
+HTTPS_URL = "cloning https://github.com/acme/web-app.git\n"
+CI_ENV = "GITHUB_REPOSITORY=acme/ci-app\n"
+CIRCLE_CI = "CIRCLE_PROJECT_USERNAME=acme\nCIRCLE_PROJECT_REPONAME=circle-app\n"
+ORG_REPO = "project: acme/ref-app\n"
+DOCKER_IMAGE = "pulling acme/image-app:1.4.2\n"
+JAVA_PACKAGE = "    at com.acme.billing.Invoice.total(Invoice.java:42)\n"
+SERVICE_NAME = "SERVICE_NAME=BILLING_API\n"
+
+
+@pytest.fixture(params=["hyperscan", "literal_gates"])
+def detector(request):
+    """A fresh detector (empty result cache), with and without the hyperscan prefilter"""
+    detector = GitRepositoryDetector()
+    if request.param == "literal_gates":
+        detector._hs_db = detector._hs_db_b = None
+    elif detector._hs_db is None:
+        pytest.skip("hyperscan is not installed")
+    return detector
+
+
+class TestDetectionPriority:
+    """Test the highest-priority pattern decides the repository, wherever it appears"""
+    
+    @pytest.mark.parametrize("winner,loser,repository,method,confidence", [
+        (HTTPS_URL, CI_ENV, "acme/web-app", "https_url", "very_high"),
+        (CI_ENV, ORG_REPO, "acme/ci-app", "github_env_var", "very_high"),
+        (CIRCLE_CI, ORG_REPO, "acme/circle-app", "circle_ci_env", "very_high"),
+        (ORG_REPO, DOCKER_IMAGE, "acme/ref-app", "explicit_repo_ref", "high"),
+        (DOCKER_IMAGE, JAVA_PACKAGE, "acme/image-app", "docker_image_tag", "high"),
+        (JAVA_PACKAGE, SERVICE_NAME, "billing/acme", "package_name_inference", "medium"),
+    ])
+    def test_higher_priority_wins(self, detector, winner, loser, repository, method, confidence):
+        """Test the higher-priority line wins whether it comes first or last"""
+        for log in (winner + loser, loser + winner):
+            detector._result_cache.clear()
+            result = detector.detect_repository(log)
+            
+            assert result['repository'] == repository
+            assert result['detection_methods'] == [method]
+            assert result['confidence'] == confidence
+    
+    def test_https_url_fields(self, detector):
+        """Test a URL sets the service, URL and service name"""
+        result = detector.detect_repository(HTTPS_URL)
+        
+        assert result['git_service'] == 'github'
+        assert result['repository_url'] == "https://github.com/acme/web-app.git"
+        assert result['service_name'] == "web-app"
+    
+    def test_docker_hex_tag_is_commit(self, detector):
+        """Test a hex image tag is taken as the commit hash"""
+        result = detector.detect_repository("image: acme/api:3f2a9c1d\n")
+        
+        assert result['repository'] == "acme/api"
+        assert result['commit_hash'] == "3f2a9c1d"
+    
+    def test_service_name_suggestions(self, detector):
+        """Test a service name alone gives suggestions but no repository"""
+        result = detector.detect_repository(SERVICE_NAME)
+        
+        assert result['repository'] is None
+        assert result['service_name'] == "BILLING_API"
+        assert result['repository_suggestions']
+        assert result['detection_methods'] == ['service_name_inference']
+        assert result['confidence'] == 'low'
+    
+    def test_circle_ci_needs_both_variables(self, detector):
+        """Test CIRCLE_PROJECT_USERNAME without REPONAME falls through to lower patterns"""
+        result = detector.detect_repository("CIRCLE_PROJECT_USERNAME=acme\n" + DOCKER_IMAGE)
+        
+        assert result['repository'] == "acme/image-app"
+        assert result['detection_methods'] == ['docker_image_tag']
+    
+    def test_partial_git_info(self, detector):
+        """Test commit and branch alone are reported with low confidence"""
+        result = detector.detect_repository("checkout branch: feature/login\ncommit 3f2a9c1d7e\n")
+        
+        assert result['repository'] is None
+        assert result['commit_hash'] == "3f2a9c1d7e"
+        assert result['branch'] == "feature/login"
+        assert result['detection_methods'] == ['partial_git_info']
+        assert result['confidence'] == 'low'
+    
+    def test_nothing_detected(self, detector):
+        """Test a log with no Git information detects nothing"""
+        result = detector.detect_repository("INFO request handled in 12ms\n")
+        
+        assert result['repository'] is None
+        assert result['detection_methods'] == []
+
+
+class TestCiEnvVariables:
+    """Test CI/CD variables: the service and method follow the variable, the leftmost one wins"""
+    
+    @pytest.mark.parametrize("line,repository,git_service,method", [
+        ("GITHUB_REPOSITORY=acme/gh-app", "acme/gh-app", "github", "github_env_var"),
+        ("CI_PROJECT_PATH=acme/gl-app", "acme/gl-app", "gitlab", "gitlab_env_var"),
+        # Trailing slash: a bare project URL is taken by the higher-priority https_url
+        ("CI_PROJECT_URL=https://gitlab.com/acme/gl-url-app/", "acme/gl-url-app", "gitlab", "gitlab_env_var"),
+        ("TRAVIS_REPO_SLUG=acme/travis-app", "acme/travis-app", None, "travis_ci_env"),
+    ])
+    def test_single_variable(self, detector, line, repository, git_service, method):
+        """Test each variable sets its own service and method"""
+        result = detector.detect_repository(line + "\n")
+        
+        assert result['repository'] == repository
+        assert result['git_service'] == git_service
+        assert result['detection_methods'] == [method]
+        assert result['confidence'] == 'very_high'
+    
+    @pytest.mark.parametrize("lines,repository,git_service,method", [
+        (["TRAVIS_REPO_SLUG=acme/travis-app", "GITHUB_REPOSITORY=acme/gh-app"],
+         "acme/travis-app", None, "travis_ci_env"),
+        (["GITHUB_REPOSITORY=acme/gh-app", "TRAVIS_REPO_SLUG=acme/travis-app"],
+         "acme/gh-app", "github", "github_env_var"),
+        (["CI_PROJECT_PATH=acme/gl-app", "GITHUB_REPOSITORY=acme/gh-app"],
+         "acme/gl-app", "gitlab", "gitlab_env_var"),
+        (["TRAVIS_REPO_SLUG=acme/travis-app", "CI_PROJECT_URL=https://gitlab.com/acme/gl-url-app/"],
+         "acme/travis-app", None, "travis_ci_env"),
+        (["CI_PROJECT_URL=https://gitlab.com/acme/gl-url-app/", "TRAVIS_REPO_SLUG=acme/travis-app"],
+         "acme/gl-url-app", "gitlab", "gitlab_env_var"),
+    ])
+    def test_leftmost_variable_wins(self, detector, lines, repository, git_service, method):
+        """Test the first variable in the log wins, not the first in GitHub/GitLab/Travis order"""
+        result = detector.detect_repository("\n".join(lines) + "\n")
+        
+        assert result['repository'] == repository
+        assert result['git_service'] == git_service
+        assert result['detection_methods'] == [method]
+
+
+class TestDetectFromPath:
+    """Test detecting from a file on disk agrees with detecting from its text"""
+    
+    @pytest.mark.parametrize("log", [
+        HTTPS_URL + CI_ENV,
+        "TRAVIS_REPO_SLUG=acme/travis-app\nGITHUB_REPOSITORY=acme/gh-app\n",
+        CIRCLE_CI,
+        DOCKER_IMAGE + JAVA_PACKAGE,
+        SERVICE_NAME,
+        "branch: main\nsha: 3f2a9c1d7e\n",
+    ])
+    def test_path_matches_text(self, detector, tmp_path, log):
+        """Test detect_repository_from_path gives the same result as detect_repository"""
+        path = tmp_path / "app.log"
+        path.write_text(log)
+        from_path = detector.detect_repository_from_path(str(path))
+        detector._result_cache.clear()
+        
+        assert from_path == detector.detect_repository(log)
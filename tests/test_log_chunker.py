@@ -0,0 +1,126 @@
+"""
+LogChunker.stream_chunks Test Suite
+
+Unit tests (no server needed) checking that the block scanner produces the
+same chunks as reading the file line by line in text mode.
+"""
+
+import random
+
+import pytest
+
+from services.log_chunker import LogChunker
+
+
+def line_loop_chunks(path, chunk_size):
+    """Reference chunking: iterate lines, cut once a chunk reaches chunk_size characters"""
+    chunks = []
+    buffer = []
+    buffer_size = 0
+    line_number = 0
+    start_line = 0
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line_number += 1
+            buffer.append(line)
+            buffer_size += len(line)
+            if buffer_size >= chunk_size:
+                chunks.append((start_line, line_number, ''.join(buffer), buffer_size))
+                buffer = []
+                buffer_size = 0
+                start_line = line_number
+    if buffer:
+        chunks.append((start_line, line_number, ''.join(buffer), buffer_size))
+    return chunks
+
+
+def stream_chunks(path, chunk_size, read_buffer_size=None):
+    """Chunks from stream_chunks as (start_line, end_line, content, size)"""
+    chunker = LogChunker(chunk_size=chunk_size)
+    if read_buffer_size:
+        chunker.READ_BUFFER_SIZE = read_buffer_size
+    return [
+        (chunk.start_line, chunk.end_line, chunk.content, chunk.size)
+        for chunk in chunker.stream_chunks(str(path), compute_hash=False)
+    ]
+
+
+def write_log(tmp_path, data: bytes):
+    """Write raw log bytes to a temporary file"""
+    path = tmp_path / "app.log"
+    path.write_bytes(data)
+    return path
+
+
+class TestStreamChunks:
+    """Test stream_chunks boundaries and line ranges"""
+    
+    @pytest.mark.parametrize("newline", [b"\n", b"\r\n", b"\r"])
+    @pytest.mark.parametrize("read_buffer_size", [None, 1, 7])
+    def test_matches_line_loop(self, tmp_path, newline, read_buffer_size):
+        """Test random logs chunk exactly like the line loop, for every newline style"""
+        rng = random.Random(1)
+        for _ in range(50):
+            lines = [b"x" * rng.randint(0, 30) for _ in range(rng.randint(0, 40))]
+            data = newline.join(lines) + (newline if rng.random() < 0.5 else b"")
+            path = write_log(tmp_path, data)
+            chunk_size = rng.randint(1, 60)
+            assert stream_chunks(path, chunk_size, read_buffer_size) == line_loop_chunks(path, chunk_size)
+    
+    def test_line_ranges_are_contiguous(self, tmp_path):
+        """Test each chunk starts where the previous one ended and the last ends at the last line"""
+        path = write_log(tmp_path, b"".join(b"2024-03-05 10:00:%02d INFO line %d\n" % (i % 60, i) for i in range(500)))
+        chunks = list(LogChunker(chunk_size=200).stream_chunks(str(path)))
+        
+        assert [c.chunk_id for c in chunks] == list(range(len(chunks)))
+        assert chunks[0].start_line == 0
+        for previous, chunk in zip(chunks, chunks[1:]):
+            assert chunk.start_line == previous.end_line
+        assert chunks[-1].end_line == 500
+        assert all(c.size >= 200 for c in chunks[:-1])
+    
+    def test_crlf_content_is_normalized(self, tmp_path):
+        """Test CRLF line endings come out as '\\n' and count as one line each"""
+        path = write_log(tmp_path, b"first\r\nsecond\r\nthird\r\n")
+        chunks = list(LogChunker(chunk_size=1000).stream_chunks(str(path)))
+        
+        assert len(chunks) == 1
+        assert chunks[0].content == "first\nsecond\nthird\n"
+        assert (chunks[0].start_line, chunks[0].end_line, chunks[0].size) == (0, 3, 19)
+    
+    def test_missing_final_newline(self, tmp_path):
+        """Test a last line without a newline is kept and counted"""
+        path = write_log(tmp_path, b"aaaa\nbbbb\ncc")
+        chunks = stream_chunks(path, chunk_size=5)
+        
+        assert chunks == [(0, 1, "aaaa\n", 5), (1, 2, "bbbb\n", 5), (2, 3, "cc", 2)]
+    
+    def test_block_smaller_than_a_line(self, tmp_path):
+        """Test lines longer than the read block still end chunks at their newline"""
+        path = write_log(tmp_path, b"a" * 100 + b"\n" + b"b" * 50 + b"\n" + b"c" * 10)
+        chunks = stream_chunks(path, chunk_size=20, read_buffer_size=8)
+        
+        assert chunks == line_loop_chunks(path, 20)
+        assert [(start, end) for start, end, _, _ in chunks] == [(0, 1), (1, 2), (2, 3)]
+    
+    def test_multibyte_sizes_count_characters(self, tmp_path):
+        """Test sizes and boundaries are measured in characters, not bytes"""
+        path = write_log(tmp_path, "é€😀\n".encode() * 20)
+        
+        assert stream_chunks(path, chunk_size=9) == line_loop_chunks(path, 9)
+    
+    def test_stat_only_matches_full_chunks(self, tmp_path):
+        """Test stat_only chunks carry the same line ranges and sizes as full ones"""
+        path = write_log(tmp_path, b"line one\r\nline two\nline three\n" * 30)
+        chunker = LogChunker(chunk_size=64)
+        full = [(c.start_line, c.end_line, c.size) for c in chunker.stream_chunks(str(path))]
+        stats = list(chunker.stream_chunks(str(path), stat_only=True))
+        
+        assert [(c.start_line, c.end_line, c.size) for c in stats] == full
+        assert all(c.content is None and c.hash is None for c in stats)
+    
+    def test_empty_file(self, tmp_path):
+        """Test an empty file yields no chunks"""
+        path = write_log(tmp_path, b"")
+        
+        assert stream_chunks(path, chunk_size=10) == []
@@ -0,0 +1,82 @@
+"""
+TestGenerator Response Parsing Test Suite
+
+Unit tests (no server or API keys needed) for picking the test case array
+out of a model's reply.
+"""
+
+import json
+
+import pytest
+
+from services import test_generator as generator_module
+
+JEST_CASE = {
+    "description": "Rejects an expired token",
+    "priority": "high",
+    "risk_score": 0.8,
+    "test_code": "describe('auth', () => { it('rejects', () => { expect(status).toBe(401); }); });",
+}
+
+
+@pytest.fixture
+def generator():
+    """A generator that is never asked to call a provider"""
+    return generator_module.TestGenerator(ai_model="gpt-4o", api_key="test-key")
+
+
+class TestParseTestResponse:
+    """Test _parse_test_response finds the array of test cases"""
+    
+    def test_plain_array(self, generator):
+        """Test a bare JSON array is parsed as is"""
+        assert generator._parse_test_response(json.dumps([JEST_CASE]), "jest") == [JEST_CASE]
+    
+    @pytest.mark.parametrize("prose", [
+        "Here are [3] tests:",
+        "See [the docs] and [1, 2]; cases follow:",
+        "An empty list [] would mean nothing to test. Instead:",
+        'Quoting "[" and "]" in prose: [',
+    ])
+    def test_prose_brackets_before_array(self, generator, prose):
+        """Test brackets in prose before the array don't hide it"""
+        response = f"{prose}\n```json\n{json.dumps([JEST_CASE])}\n```"
+        
+        assert generator._parse_test_response(response, "jest") == [JEST_CASE]
+    
+    def test_non_object_items_dropped(self, generator):
+        """Test items that aren't objects never reach the framework check"""
+        response = json.dumps([3, "text", JEST_CASE, None])
+        
+        assert generator._parse_test_response(response, "jest") == [JEST_CASE]
+    
+    def test_brackets_inside_strings(self, generator):
+        """Test brackets inside JSON strings don't end the array"""
+        case = dict(JEST_CASE, description="Handles ] and [ in input")
+        
+        assert generator._parse_test_response(f"Tests: {json.dumps([case])} done", "jest") == [case]
+    
+    def test_framework_mismatch_flagged(self, generator):
+        """Test a case whose code doesn't match the framework is kept but flagged"""
+        case = dict(JEST_CASE, test_code="def test_auth():\n    assert status == 401\n")
+        parsed = generator._parse_test_response(json.dumps([case]), "jest")
+        
+        assert len(parsed) == 1
+        assert parsed[0]["description"].startswith("⚠️ FRAMEWORK MISMATCH")
+    
+    def test_empty_array(self, generator):
+        """Test an empty array means no test cases"""
+        assert generator._parse_test_response("[]", "jest") == []
+    
+    @pytest.mark.parametrize("response", [
+        "No tests could be generated.",
+        "Only [3] brackets and [no, json] here",
+        '[{"description": "truncated',
+    ])
+    def test_no_array_falls_back_to_sample(self, generator, response):
+        """Test a reply without a usable array gives one sample test case"""
+        parsed = generator._parse_test_response(response, "jest")
+        
+        assert len(parsed) == 1
+        assert parsed[0]["description"] == "Generated jest test from analysis"
+        assert parsed[0]["test_code"]